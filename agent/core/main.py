@@ -22,6 +22,7 @@ from agent.db.async_logger import async_logger
 from agent.utils.learning import init_learning
 from .shadow_runner import run_shadow_cycle
 from agent.services import telegram
+from agent.services._http import close_connector
 
 
 
@@ -279,6 +280,7 @@ async def main_loop():
         except KeyboardInterrupt:
             print("\n[STOP] Shutting down gracefully...")
             await async_logger.stop()
+            await close_connector()
             break
         except Exception as e:
             print(f"\n[ERROR] Cycle failed: {e}")
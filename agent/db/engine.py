@@ -5,6 +5,7 @@ SQLModel/SQLAlchemy engine setup with async support.
 """
 
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from contextlib import contextmanager
@@ -13,13 +14,27 @@ import os
 from ..config import get_config
 
 
+# Sync engine (shared so sessions reuse pooled connections and the statement cache)
+sync_engine = None
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets the dashboard read while the agent writes; NORMAL sync is safe under WAL."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
 def get_sync_engine():
-    """Get synchronous database engine."""
-    cfg = get_config()
-    db_url = cfg.database_url
-    
-    # Convert sqlite to sqlite+aiosqlite for async if needed
-    return create_engine(db_url, echo=False)
+    """Get synchronous database engine (lazy init)."""
+    global sync_engine
+    if sync_engine is None:
+        cfg = get_config()
+        sync_engine = create_engine(cfg.database_url, echo=False)
+        if sync_engine.dialect.name == "sqlite":
+            event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+    return sync_engine
 
 
 def get_async_engine():
@@ -40,6 +55,11 @@ def create_tables():
     
     engine = get_sync_engine()
     SQLModel.metadata.create_all(engine)
+    
+    # create_all skips existing tables, so add any indexes introduced since
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
 
 @contextmanager
@@ -5,14 +5,24 @@ SQLModel schemas for trades, signals, exit plans, and agent logs.
 """
 
 from datetime import datetime
+from enum import IntEnum
 from typing import Optional
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 import json
 
 
+class Direction(IntEnum):
+    """Integer codes for trade direction, used by stats queries (column stays text)."""
+    LONG = 0
+    SHORT = 1
+
+
 class Trade(SQLModel, table=True):
     """Record of executed trades."""
     __tablename__ = "trades"
+    # Serves the per-coin open / closed-since / recent-closed lookups
+    __table_args__ = (Index("ix_trade_coin_closed_at", "coin", "closed_at"),)
     
     id: Optional[int] = Field(default=None, primary_key=True)
     opened_at: datetime = Field(default_factory=datetime.utcnow)
@@ -7,15 +7,83 @@ CRUD operations for trades, signals, exit plans, and logs.
 from datetime import datetime, timedelta
 from typing import Optional
 from sqlmodel import Session, select, func
-from sqlalchemy import desc
+from sqlalchemy import desc, bindparam, case, Row
 
-from .models import Trade, Signal, ExitPlan, Approval, AgentLog, MarketMemory, InferenceLog
+from .models import Trade, Signal, ExitPlan, Approval, AgentLog, MarketMemory, InferenceLog, Direction
 from .engine import get_session
 
 
+# Column selects for hot per-cycle reads (no ORM entity loading), built once
+# at import; values bind per call so the engine's compiled cache is hit every
+# cycle instead of rebuilding the construct
+_STMT_PERF_METRICS = (
+    select(
+        func.count().label("total_trades"),
+        func.coalesce(func.sum(Trade.pnl_usd), 0).label("total_pnl_usd"),
+        func.coalesce(func.sum(case((Trade.pnl_pct > 0, 1), else_=0)), 0).label("wins")
+    )
+    .where(Trade.closed_at != None)
+    .where(Trade.closed_at >= bindparam("start_time"))
+)
+_STMT_PERF_METRICS_COIN = _STMT_PERF_METRICS.where(Trade.coin == bindparam("coin"))
+# Reasoning blobs are truncated in SQL so only the prefix the prompt uses is read
+_STMT_LATEST_INFERENCE = (
+    select(
+        InferenceLog.id,
+        InferenceLog.timestamp,
+        InferenceLog.analyst_signal,
+        func.substr(InferenceLog.analyst_reasoning, 1, 250).label("analyst_reasoning")
+    )
+    .order_by(desc(InferenceLog.timestamp))
+    .limit(1)
+)
+_STMT_ACTIVE_THESES = (
+    select(
+        Trade.direction,
+        Trade.coin,
+        Trade.entry_price,
+        func.substr(Trade.reasoning, 1, 80).label("reasoning")
+    )
+    .where(Trade.coin == bindparam("coin"))
+    .where(Trade.closed_at.is_(None))
+)
+_STMT_PATTERN_STATS = (
+    select(
+        case(
+            (Trade.direction == "LONG", int(Direction.LONG)),
+            (Trade.direction == "SHORT", int(Direction.SHORT)),
+            else_=-1
+        ).label("direction"),
+        case((Trade.pnl_usd > 0, 1), else_=0).label("win")
+    )
+    .where(Trade.coin == bindparam("coin"))
+    .where(Trade.closed_at != None)
+    .order_by(desc(Trade.closed_at))
+    .limit(bindparam("limit"))
+)
+
+
+def _raw_conn_query(session: Session, statement, params: Optional[dict] = None, one: bool = False):
+    """
+    Execute a Core column select on the session's connection, skipping
+    the ORM execution path. Returns Row tuples (attribute access by column name).
+    """
+    result = session.connection().execute(statement, params or {})
+    return result.first() if one else result.all()
+
+
 class TradeRepository:
     """CRUD operations for trades."""
     
+    # Per-coin counter bumped on every close_trade() so callers can
+    # invalidate cached trade stats for just that coin
+    closed_versions: dict[str, int] = {}
+    
+    @staticmethod
+    def get_closed_version(coin: str) -> int:
+        """Get the close counter for a coin (0 if none closed this process)."""
+        return TradeRepository.closed_versions.get(coin, 0)
+    
     @staticmethod
     def create(session: Session, trade: Trade) -> Trade:
         session.add(trade)
@@ -41,18 +109,16 @@ class TradeRepository:
 
     @staticmethod
     def get_performance_metrics(session: Session, coin: Optional[str] = None, hours: int = 24) -> dict:
-        """Calculate performance metrics for the given timeframe."""
+        """Calculate performance metrics for the given timeframe (single aggregate query)."""
         start_time = datetime.utcnow() - timedelta(hours=hours)
         
-        # Base query for closed trades in time window
-        query = select(Trade).where(Trade.closed_at >= start_time).where(Trade.closed_at != None)
-        
         if coin:
-            query = query.where(Trade.coin == coin)
-            
-        trades = session.exec(query).all()
+            row = _raw_conn_query(session, _STMT_PERF_METRICS_COIN, {"start_time": start_time, "coin": coin}, one=True)
+        else:
+            row = _raw_conn_query(session, _STMT_PERF_METRICS, {"start_time": start_time}, one=True)
         
-        if not trades:
+        total_trades = row.total_trades
+        if not total_trades:
             return {
                 "win_rate": 0.0,
                 "total_pnl_usd": 0.0,
@@ -60,14 +126,12 @@ class TradeRepository:
                 "wins": 0,
                 "losses": 0
             }
-            
-        total_pnl = sum(t.pnl_usd for t in trades if t.pnl_usd is not None)
-        wins = sum(1 for t in trades if t.pnl_pct is not None and t.pnl_pct > 0)
-        total_trades = len(trades)
+        
+        wins = int(row.wins)
         
         return {
-            "win_rate": (wins / total_trades) * 100 if total_trades > 0 else 0.0,
-            "total_pnl_usd": total_pnl,
+            "win_rate": (wins / total_trades) * 100,
+            "total_pnl_usd": float(row.total_pnl_usd),
             "total_trades": total_trades,
             "wins": wins,
             "losses": total_trades - wins
@@ -86,6 +150,29 @@ class TradeRepository:
         statement = statement.limit(limit)
         return list(session.exec(statement).all())
     
+    @staticmethod
+    def get_pattern_stats(
+        session: Session,
+        coin: str,
+        limit: int = 30
+    ) -> list[tuple[int, int]]:
+        """
+        Get (direction, win) for the most recent closed trades of a coin.
+        Direction is mapped to its Direction code in SQL (-1 if unknown);
+        win is 1 when pnl_usd > 0, else 0 (NULL PnL counts as a loss).
+        Column-only select, so no Trade ORM instances are built.
+        """
+        return _raw_conn_query(session, _STMT_PATTERN_STATS, {"coin": coin, "limit": limit})
+    
+    @staticmethod
+    def get_active_theses(session: Session, coin: str) -> list:
+        """
+        Get (direction, coin, entry_price, reasoning) rows for a coin's open trades.
+        Column-only select, so no Trade ORM instances are built; reasoning is
+        truncated to 80 chars in SQL.
+        """
+        return _raw_conn_query(session, _STMT_ACTIVE_THESES, {"coin": coin})
+    
     @staticmethod
     def close_trade(
         session: Session,
@@ -113,6 +200,8 @@ class TradeRepository:
         session.add(trade)
         session.commit()
         session.refresh(trade)
+        versions = TradeRepository.closed_versions
+        versions[trade.coin] = versions.get(trade.coin, 0) + 1
         return trade
 
 
@@ -279,6 +368,15 @@ class InferenceLogRepository:
         """Get recent inference logs."""
         statement = select(InferenceLog).order_by(desc(InferenceLog.timestamp)).limit(limit)
         return list(session.exec(statement).all())
+    
+    @staticmethod
+    def get_latest(session: Session) -> Optional[Row]:
+        """
+        Get the most recent inference log as a lightweight Row (or None).
+        Only id, timestamp (datetime), analyst_signal and the first 250 chars
+        of analyst_reasoning are loaded.
+        """
+        return _raw_conn_query(session, _STMT_LATEST_INFERENCE, one=True)
 
 
 class ApprovalRepository:
@@ -7,6 +7,7 @@ Uses 3-phase approach:
 3. Single LLM Analysis Call
 """
 
+import asyncio
 import json
 import time
 from typing import Any
@@ -19,7 +20,7 @@ from agent.db import get_session, MarketMemoryRepository
 from agent.db.models import MarketMemory, Trade
 from agent.db.repository import InferenceLogRepository
 from agent.config.config import get_config
-from agent.utils.memory_loader import preload_memory, format_memory_context
+from agent.utils.memory_loader import preload_memory_async, format_memory_context
 from agent.services.data_fetcher import fetch_analyst_data, calculate_timestamps, summarize_candles
 from agent.utils.learning import get_learning_context
 from datetime import datetime
@@ -27,6 +28,13 @@ from sqlmodel import select
 from agent.models.schemas import TradeSignal
 
 
+async def _load_memory(coin: str) -> tuple[dict, float]:
+    """Pre-load memory context, returning it with the elapsed time in ms."""
+    start = time.time()
+    memory = await preload_memory_async(coin)
+    return memory, (time.time() - start) * 1000
+
+
 async def analyst_node(state: dict[str, Any], tools: list) -> dict[str, Any]:
     """
     Market Analyst node (v2) - 3-Phase Architecture.
@@ -96,9 +104,8 @@ async def analyst_node(state: dict[str, Any], tools: list) -> dict[str, Any]:
     
     with get_session() as session:
         # Fetch last analyst conclusion
-        recent_logs = InferenceLogRepository.get_recent(session, limit=1)
-        if recent_logs:
-            last_log = recent_logs[0]
+        last_log = InferenceLogRepository.get_latest(session)
+        if last_log:
             last_signal = last_log.analyst_signal or "N/A"
             last_reasoning = (last_log.analyst_reasoning or "")[:200]
             last_conclusion = f"LAST CYCLE: Signal={last_signal}, Reasoning: {last_reasoning}..."
@@ -116,23 +123,21 @@ async def analyst_node(state: dict[str, Any], tools: list) -> dict[str, Any]:
                 trade_thesis = f"ORIGINAL THESIS: {active_trade.reasoning[:300]}..."
                 print(f"[Analyst v2] Trade thesis loaded: {active_trade.reasoning[:50]}...")
     
-    # ===== PHASE 1: MEMORY PRE-LOAD =====
-    phase1_start = time.time()
-    memory = preload_memory(target_coin)
-    memory_context = format_memory_context(memory)
-    phase1_time = (time.time() - phase1_start) * 1000
-    print(f"[Analyst v2] Phase 1 (Memory): {phase1_time:.0f}ms")
-    
-    # ===== PHASE 2: PARALLEL DATA FETCH =====
+    # ===== PHASE 1 + 2: MEMORY PRE-LOAD alongside PARALLEL DATA FETCH =====
+    # DB reads run in a worker thread while market data and trade history
+    # are fetched over MCP, so neither waits on the other.
     phase2_start = time.time()
     timestamps = calculate_timestamps()
-    data = await fetch_analyst_data(tools, target_coin, timestamps)
-    
-    # Fetch trade history learning (also async)
-    learning_context = await get_learning_context(tools)
+    (memory, phase1_time), data, learning_context = await asyncio.gather(
+        _load_memory(target_coin),
+        fetch_analyst_data(tools, target_coin, timestamps),
+        get_learning_context(tools)
+    )
+    memory_context = format_memory_context(memory)
+    print(f"[Analyst v2] Phase 1 (Memory): {phase1_time:.0f}ms")
     
     phase2_time = (time.time() - phase2_start) * 1000
-    print(f"[Analyst v2] Phase 2 (Fetch + Learning): {phase2_time:.0f}ms")
+    print(f"[Analyst v2] Phase 2 (Fetch + Learning, overlaps Phase 1): {phase2_time:.0f}ms")
     
     # Debug: check what we got
     candles_5m_raw = data.get("candles_5m", "")
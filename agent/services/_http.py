@@ -0,0 +1,48 @@
+"""
+Shared HTTP Connection Pool
+
+A single aiohttp TCPConnector shared by every outbound ClientSession
+(Telegram notifications, etc.) so they reuse keep-alive TLS connections
+instead of opening a fresh pool per request.
+"""
+
+import ssl
+import aiohttp
+from typing import Optional
+
+_connector: Optional[aiohttp.TCPConnector] = None
+
+
+def _get_ssl_context():
+    """Create SSL context (workaround for Python 3.14 SSL issues)."""
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+    return ssl_context
+
+
+def get_connector() -> aiohttp.TCPConnector:
+    """
+    Get the shared connector (lazy init, must be called inside the event loop).
+
+    Sessions built on it must pass connector_owner=False so closing a
+    session doesn't tear down the shared pool.
+    """
+    global _connector
+    if _connector is None or _connector.closed:
+        _connector = aiohttp.TCPConnector(
+            ssl=_get_ssl_context(),
+            limit=20,
+            keepalive_timeout=120,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
+    return _connector
+
+
+async def close_connector():
+    """Close the shared connector on shutdown."""
+    global _connector
+    if _connector is not None and not _connector.closed:
+        await _connector.close()
+    _connector = None
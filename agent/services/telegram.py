@@ -4,27 +4,52 @@ Telegram Notification Module
 Sends inference updates to Telegram for monitoring.
 """
 
-import os
 import asyncio
-import ssl
 import aiohttp
+import orjson
 from typing import Optional
 
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+from agent.config.config import get_config
+from ._http import get_connector
 
+# Credentials come from the shared agent config (single env read)
+_cfg = get_config()
+TELEGRAM_BOT_TOKEN = _cfg.telegram_bot_token
+TELEGRAM_CHAT_ID = _cfg.telegram_chat_id
+
+# Config is read once at import, so resolve these once as well
+_ENABLED = bool(TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID)
+_SEND_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage" if _ENABLED else ""
+
+# Constant sendMessage fields; only text/parse_mode vary per call
+_PAYLOAD_TEMPLATE = {
+    "chat_id": TELEGRAM_CHAT_ID,
+    "parse_mode": "Markdown",
+    "disable_web_page_preview": True
+}
+
+# Built once: a tighter connect timeout fails fast on dead networks/slow DNS
+_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3)
+
+def _json_dumps(obj) -> str:
+    """Request body encoder for aiohttp (json_serialize must return str, orjson gives bytes)."""
+    return orjson.dumps(obj).decode()
 
-def is_enabled() -> bool:
-    """Check if Telegram notifications are enabled."""
-    return bool(TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID)
 
+# Escape table for LLM text embedded in legacy-Markdown messages.
+# Unbalanced _ * ` [ in free text makes Telegram reject the whole message.
+_MD_ESCAPE = str.maketrans({c: f"\\{c}" for c in "_*`["})
 
-def _get_ssl_context():
-    """Create SSL context (workaround for Python 3.14 SSL issues)."""
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
-    return ssl_context
+# Retries for 429 (rate limit) and 5xx responses
+_MAX_ATTEMPTS = 3
+# Notifications are awaited inline by the trading loop, so never wait longer
+# than this between attempts; a longer retry_after drops the message instead
+_MAX_RETRY_DELAY = 5.0
+
+
+def is_enabled() -> bool:
+    """Check if Telegram notifications are enabled."""
+    return _ENABLED
 
 
 async def send_message(text: str, parse_mode: str = "Markdown") -> bool:
@@ -35,30 +60,49 @@ async def send_message(text: str, parse_mode: str = "Markdown") -> bool:
         text: Message text (supports Markdown)
         parse_mode: "Markdown" or "HTML"
     
+    Retries on 429 (honoring Telegram's retry_after) and on 5xx with
+    exponential backoff, up to _MAX_ATTEMPTS. Waits are capped at
+    _MAX_RETRY_DELAY; a longer retry_after drops the message.
+    
     Returns:
         True if sent successfully, False otherwise
     """
-    if not is_enabled():
+    if not _ENABLED:
         return False
     
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    
-    payload = {
-        "chat_id": TELEGRAM_CHAT_ID,
-        "text": text,
-        "parse_mode": parse_mode,
-        "disable_web_page_preview": True
-    }
+    payload = {**_PAYLOAD_TEMPLATE, "text": text, "parse_mode": parse_mode}
     
     try:
-        connector = aiohttp.TCPConnector(ssl=_get_ssl_context())
-        async with aiohttp.ClientSession(connector=connector) as session:
-            async with session.post(url, json=payload, timeout=10) as resp:
-                if resp.status == 200:
-                    return True
-                else:
-                    print(f"[Telegram] Failed to send: {resp.status}")
-                    return False
+        async with aiohttp.ClientSession(
+            connector=get_connector(), connector_owner=False, json_serialize=_json_dumps
+        ) as session:
+            for attempt in range(_MAX_ATTEMPTS):
+                async with session.post(_SEND_URL, json=payload, timeout=_TIMEOUT) as resp:
+                    if resp.status == 200:
+                        return True
+                    
+                    if resp.status == 429:
+                        # Rate limited: honor the server-provided delay
+                        try:
+                            body = await resp.json()
+                            delay = float(body.get("parameters", {}).get("retry_after", 1))
+                        except Exception:
+                            delay = 1.0
+                        if delay > _MAX_RETRY_DELAY:
+                            print(f"[Telegram] Rate limited for {delay:.0f}s, dropping message")
+                            return False
+                    elif resp.status >= 500:
+                        delay = min(2 ** attempt, _MAX_RETRY_DELAY)
+                    else:
+                        print(f"[Telegram] Failed to send: {resp.status}")
+                        return False
+                
+                if attempt + 1 < _MAX_ATTEMPTS:
+                    print(f"[Telegram] Send returned {resp.status}, retrying in {delay:.0f}s")
+                    await asyncio.sleep(delay)
+            
+            print(f"[Telegram] Failed to send after {_MAX_ATTEMPTS} attempts: {resp.status}")
+            return False
     except Exception as e:
         print(f"[Telegram] Error sending message: {e}")
         return False
@@ -90,16 +134,16 @@ def format_inference_update(
     signal = analyst_signal.get("signal", "HOLD")
     confidence = analyst_signal.get("confidence", 0)
     conf_pct = confidence * 100 if confidence <= 1 else confidence
-    reasoning = analyst_signal.get("reasoning", "No reasoning provided")
+    reasoning = str(analyst_signal.get("reasoning", "No reasoning provided")).translate(_MD_ESCAPE)
     
-    # Build the message components
+    # Build the message as a list of lines and join once at the end
     
     # 1. Header
-    msg = f"⏱️ *Cycle #{cycle}*\n"
+    parts: list[str] = [f"⏱️ *Cycle #{cycle}*"]
     
     # 2. Market Data
-    msg += f"💰 *BTC Price:* `${current_close:,.2f}`\n"
-    msg += f"🧠 *Context Injection:* {'✅ Ready' if phase1 > 0 else '⚠️ Empty'}\n"
+    parts.append(f"💰 *BTC Price:* `${current_close:,.2f}`")
+    parts.append(f"🧠 *Context Injection:* {'✅ Ready' if phase1 > 0 else '⚠️ Empty'}")
     
     # 3. Position Info (if exists)
     if position_direction:
@@ -117,25 +161,30 @@ def format_inference_update(
          liq_str = f"${liq_val:,.2f}" if liq_val else "None"
          
          emoji = "🟢" if position_direction == "LONG" else "🔴"
-         msg += f"\n{emoji} *OPEN POSITION ({position_direction})*\n"
-         msg += f"Entry: `{entry_str}` | Size: `{size_val}`\n"
-         msg += f"TP: `{tp_str}` | SL: `{sl_str}`\n"
-         msg += f"Liq: `{liq_str}` | Margin: `${margin_val:.2f}`\n"
+         parts.append("")
+         parts.append(f"{emoji} *OPEN POSITION ({position_direction})*")
+         parts.append(f"Entry: `{entry_str}` | Size: `{size_val}`")
+         parts.append(f"TP: `{tp_str}` | SL: `{sl_str}`")
+         parts.append(f"Liq: `{liq_str}` | Margin: `${margin_val:.2f}`")
     
     # 4. Analysis
     conf_emoji = "🔥" if conf_pct > 70 else "🤔"
     if signal == "HOLD": conf_emoji = "✋"
     if signal == "CLOSE": conf_emoji = "🚪"
     
-    msg += f"\n{conf_emoji} *SIGNAL:* `{signal}` ({conf_pct:.0f}%)\n"
+    parts.append("")
+    parts.append(f"{conf_emoji} *SIGNAL:* `{signal}` ({conf_pct:.0f}%)")
     
     # Expanded Reasoning
-    msg += f"\n📝 *Reasoning:*\n{reasoning}\n"
+    parts.append("")
+    parts.append("📝 *Reasoning:*")
+    parts.append(reasoning)
     
     # Footer
-    msg += f"\n_⏱️ Analysis Time: {total_time}ms | Eq: ${equity:.0f}_"
+    parts.append("")
+    parts.append(f"_⏱️ Analysis Time: {total_time}ms | Eq: ${equity:.0f}_")
     
-    return msg
+    return "\n".join(parts)
 
 
 def format_trade_executed(
@@ -159,18 +208,14 @@ def format_trade_executed(
     if order_type == "SCALE_OUT": header = "📉 *SCALE OUT*"
     if order_type == "CUT_LOSS": header = "🚨 *CUT LOSS*"
     
-    message = f"""{header}
+    sl_line = f"\nSL: `${stop_loss:,.2f}`" if stop_loss else ""
+    tp_line = f"\nTP: `${take_profit:,.2f}`" if take_profit else ""
+    
+    return f"""{header}
 
 {emoji} *{coin} {direction}*
 Price: `${entry_price:,.2f}`
-Size: `${size_usd:.2f}` @ `{leverage}x`"""
-    
-    if stop_loss:
-        message += f"\nSL: `${stop_loss:,.2f}`"
-    if take_profit:
-        message += f"\nTP: `${take_profit:,.2f}`"
-    
-    return message
+Size: `${size_usd:.2f}` @ `{leverage}x`{sl_line}{tp_line}"""
 
 
 def format_trade_closed(
@@ -339,27 +384,31 @@ async def notify_shadow_trade_opened(
 
     emoji = "👻" # Ghost for Shadow Mode
     action_emoji = "🟢" if signal == "LONG" else "🔴"
+    sl_line = f"\nSL: `${stop_loss:,.2f}`" if stop_loss else ""
+    tp_line = f"\nTP: `${take_profit:,.2f}`" if take_profit else ""
     
-    start_msg = f"""{emoji} *SHADOW TRADE OPENED*
-    
-{action_emoji} *{coin} {signal}* ({confidence*100:.0f}%)
-Entry: `${entry_price:,.2f}`"""
-
-    if stop_loss:
-        start_msg += f"\nSL: `${stop_loss:,.2f}`"
-    if take_profit:
-        start_msg += f"\nTP: `${take_profit:,.2f}`"
+    parts: list[str] = [
+        f"{emoji} *SHADOW TRADE OPENED*",
+        "",
+        f"{action_emoji} *{coin} {signal}* ({confidence*100:.0f}%)",
+        f"Entry: `${entry_price:,.2f}`{sl_line}{tp_line}",
+    ]
     
     # State section
     if account_equity or open_position_count is not None:
-        start_msg += "\n\n📊 *State:*"
+        parts.append("")
+        parts.append("📊 *State:*")
         if account_equity:
-            start_msg += f"\nEquity: `${account_equity:,.2f}`"
+            parts.append(f"Equity: `${account_equity:,.2f}`")
         if open_position_count is not None:
-            start_msg += f"\nOpen positions: `{open_position_count}`"
+            parts.append(f"Open positions: `{open_position_count}`")
 
     if reasoning:
-        start_msg += f"\n\n📝 *Reasoning:*\n_{reasoning}_"
+        parts.append("")
+        parts.append("📝 *Reasoning:*")
+        parts.append(reasoning.translate(_MD_ESCAPE))
+
+    start_msg = "\n".join(parts)
         
     await send_message(start_msg)
 
@@ -385,6 +434,12 @@ async def notify_shadow_trade_closed(
     
     net_pnl = pnl_usd - fees_usd
     
+    win_rate_str = f" | Win Rate: `{win_rate:.1f}%`" if win_rate is not None else ""
+    cumulative_line = (
+        f"\n\n📊 *Cumulative:* `${cumulative_pnl:+.2f}`{win_rate_str}"
+        if cumulative_pnl is not None else ""
+    )
+    
     msg = f"""{emoji} *SHADOW TRADE CLOSED*
     
 {profit_emoji} *{coin} {signal}*
@@ -392,11 +447,6 @@ Entry: `${entry_price:,.2f}` → Exit: `${exit_price:,.2f}`
 Gross PnL: `${pnl_usd:+.2f}` ({pnl_pct:+.1f}%)
 Fees: `-${fees_usd:.2f}`
 Net PnL: `${net_pnl:+.2f}`
-Outcome: *{reason}*"""
-
-    if cumulative_pnl is not None:
-        msg += f"\n\n📊 *Cumulative:* `${cumulative_pnl:+.2f}`"
-        if win_rate is not None:
-            msg += f" | Win Rate: `{win_rate:.1f}%`"
+Outcome: *{reason}*{cumulative_line}"""
 
     await send_message(msg)
@@ -5,6 +5,7 @@ Learns from actual trade history fetched via MCP.
 No seed patterns - all learning is from real account data.
 """
 
+import asyncio
 import json
 from datetime import datetime
 from typing import Optional
@@ -32,6 +33,49 @@ async def fetch_trade_history(tools: list) -> list:
         return []
 
 
+def _decode_fill(raw):
+    """Decode a JSON fill, returning None if it isn't valid JSON."""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def _reduce_trades(pnl, side):
+    """
+    Single-pass reduction over closed-trade PnL and side (1=long, -1=short).
+    
+    Returns:
+        (wins, losses, total_pnl, sum_win, sum_loss, longs, long_wins, shorts, short_wins)
+    """
+    wins = 0
+    losses = 0
+    longs = 0
+    long_wins = 0
+    shorts = 0
+    short_wins = 0
+    total_pnl = 0.0
+    sum_win = 0.0
+    sum_loss = 0.0
+    for p, sd in zip(pnl, side):
+        total_pnl += p
+        if p > 0:
+            wins += 1
+            sum_win += p
+        elif p < 0:
+            losses += 1
+            sum_loss += p
+        if sd == 1:
+            longs += 1
+            if p > 0:
+                long_wins += 1
+        elif sd == -1:
+            shorts += 1
+            if p > 0:
+                short_wins += 1
+    return wins, losses, total_pnl, sum_win, sum_loss, longs, long_wins, shorts, short_wins
+
+
 def analyze_trade_performance(fills: list) -> dict:
     """
     Analyze trade history to extract performance insights.
@@ -40,57 +84,44 @@ def analyze_trade_performance(fills: list) -> dict:
     if not fills:
         return {"total_trades": 0, "insights": []}
     
-    # Group fills by closed PnL calculation
+    # Extract closed PnL and side per fill
     # Each fill has: coin, side, px, sz, time, closedPnl, etc.
-    trades = []
+    # Side is encoded as B (long) -> 1, A (short) -> -1, anything else -> 0
+    # Decode string fills (JSON from MCP) up front; dicts (the common case) pass through
+    fills = [_decode_fill(f) if isinstance(f, (str, bytes)) else f for f in fills]
+    
+    pnls = []
+    sides = []
     for fill in fills:
         try:
-            # Handle string fills (JSON from MCP)
-            if isinstance(fill, str):
-                fill = json.loads(fill)
-            
-            if not isinstance(fill, dict):
-                continue
-                
-            closed_pnl = float(fill.get("closedPnl", 0))
-            if closed_pnl != 0:  # Only count trades that closed
-                trades.append({
-                    "coin": fill.get("coin", "UNKNOWN"),
-                    "side": fill.get("side", "UNKNOWN"),
-                    "px": float(fill.get("px", 0)),
-                    "sz": float(fill.get("sz", 0)),
-                    "pnl": closed_pnl,
-                    "time": fill.get("time", 0)
-                })
-        except (ValueError, TypeError):
+            closed_pnl = float(fill["closedPnl"])
+        except (KeyError, TypeError, ValueError):
             continue
+        if closed_pnl != 0:  # Only count trades that closed
+            pnls.append(closed_pnl)
+            side = fill.get("side")
+            sides.append(1 if side == "B" else -1 if side == "A" else 0)
     
-    if not trades:
+    if not pnls:
         return {"total_trades": 0, "insights": []}
     
-    # Calculate stats
-    wins = [t for t in trades if t["pnl"] > 0]
-    losses = [t for t in trades if t["pnl"] < 0]
-    
-    total_pnl = sum(t["pnl"] for t in trades)
-    win_rate = (len(wins) / len(trades)) * 100 if trades else 0
-    avg_win = sum(t["pnl"] for t in wins) / len(wins) if wins else 0
-    avg_loss = sum(t["pnl"] for t in losses) / len(losses) if losses else 0
-    
-    # Analyze by side (LONG vs SHORT performance)
-    longs = [t for t in trades if t["side"] == "B"]
-    shorts = [t for t in trades if t["side"] == "A"]
+    # Calculate stats in a single pass
+    stats = _reduce_trades(pnls, sides)
+    n_wins, n_losses, total_pnl, sum_win, sum_loss, n_longs, long_wins, n_shorts, short_wins = stats
     
-    long_wins = len([t for t in longs if t["pnl"] > 0])
-    short_wins = len([t for t in shorts if t["pnl"] > 0])
+    n_trades = len(pnls)
+    win_rate = (n_wins / n_trades) * 100
+    avg_win = sum_win / n_wins if n_wins else 0
+    avg_loss = sum_loss / n_losses if n_losses else 0
     
-    long_wr = (long_wins / len(longs) * 100) if longs else 0
-    short_wr = (short_wins / len(shorts) * 100) if shorts else 0
+    # LONG vs SHORT performance
+    long_wr = (long_wins / n_longs * 100) if n_longs else 0
+    short_wr = (short_wins / n_shorts * 100) if n_shorts else 0
     
     # Generate insights
     insights = []
     
-    if len(longs) >= 3 and len(shorts) >= 3:
+    if n_longs >= 3 and n_shorts >= 3:
         if long_wr > short_wr + 20:
             insights.append(f"LONG trades outperform (WR: {long_wr:.0f}% vs SHORT: {short_wr:.0f}%). FAVOR LONGS.")
         elif short_wr > long_wr + 20:
@@ -109,9 +140,9 @@ def analyze_trade_performance(fills: list) -> dict:
         insights.append(f"Win rate strong ({win_rate:.0f}%). Current strategy working.")
     
     return {
-        "total_trades": len(trades),
-        "wins": len(wins),
-        "losses": len(losses),
+        "total_trades": n_trades,
+        "wins": n_wins,
+        "losses": n_losses,
         "win_rate": win_rate,
         "total_pnl": total_pnl,
         "avg_win": avg_win,
@@ -152,7 +183,8 @@ async def get_learning_context(tools: list) -> str:
     Call this in analyst_v2 to inject learning into prompt.
     """
     fills = await fetch_trade_history(tools)
-    analysis = analyze_trade_performance(fills)
+    # CPU-bound parsing/reduction runs off the event loop
+    analysis = await asyncio.to_thread(analyze_trade_performance, fills)
     return format_learning_insights(analysis)
 
 
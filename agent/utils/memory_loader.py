@@ -5,6 +5,8 @@ Unified pre-loading of all memory context from SQLite.
 Runs at the start of each inference cycle to minimize DB calls.
 """
 
+import asyncio
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from agent.db import get_session
@@ -13,52 +15,152 @@ from agent.db.repository import (
     InferenceLogRepository,
     MarketMemoryRepository
 )
-from agent.db.models import Trade
-from sqlmodel import select
+
+
+# Per-coin result caches.
+# Perf metrics, active trades and last thought change every cycle and are
+# always read fresh. Slow: daily bias (changes once per UTC day).
+# Learning patterns are memoized separately (see PATTERN_CACHE_TTL).
+SLOW_CACHE_TTL = 86400.0
+_slow_cache: dict[str, tuple[float, str, dict]] = {}  # (loaded_at, day, data)
+_learning_cache: dict[str, tuple[float, int, int, dict]] = {}  # coin -> (computed_at, closed_version, limit, patterns)
+# Trades are mostly closed by reconcile_db.py in a separate process, which
+# doesn't bump closed_version here, so patterns also expire after this long.
+PATTERN_CACHE_TTL = 300.0
+PATTERN_LIMIT = 30
+
+_today_cache: tuple[int, str] = (-1, "")  # (utc epoch day, "YYYY-MM-DD")
+
+
+def _preload_fast(session, coin: str) -> dict:
+    """Load per-cycle memory: performance, last thought, active trades."""
+    # 2. Performance Metrics (24h)
+    perf_metrics = TradeRepository.get_performance_metrics(session, coin, hours=24)
+    
+    # 3. Last Cycle Reasoning (Thought Continuity)
+    last_thought = InferenceLogRepository.get_latest(session)
+    
+    # 4. Active Trades (Position Memory)
+    # Only the columns format_memory_context reads; rows keep attribute access
+    active_trades = TradeRepository.get_active_theses(session, coin)
+    
+    return {
+        "performance": perf_metrics,
+        "last_thought": last_thought,
+        "active_trades": active_trades
+    }
+
+
+def _preload_slow(session, coin: str, today_str: str) -> dict:
+    """Load slow-changing memory: daily bias."""
+    # 1. Daily Market Bias (cached)
+    daily_bias = MarketMemoryRepository.get_today(session, coin, today_str)
+    
+    return {
+        "daily_bias": daily_bias
+    }
+
+
+def _today_str() -> str:
+    """Current UTC date as "YYYY-MM-DD", reformatted only when the day rolls over."""
+    global _today_cache
+    day = int(time.time()) // 86400
+    if day != _today_cache[0]:
+        _today_cache = (day, datetime.utcfromtimestamp(day * 86400).strftime("%Y-%m-%d"))
+    return _today_cache[1]
 
 
 def preload_memory(coin: str) -> dict:
     """
     Load all memory context in a single DB session.
+    Per-cycle parts are always read; daily bias and learning patterns are
+    cached (see SLOW_CACHE_TTL / PATTERN_CACHE_TTL).
     
     Returns:
         dict with keys: daily_bias, performance, last_thought, active_trades, learning
     """
-    today_str = datetime.utcnow().strftime("%Y-%m-%d")
+    today_str = _today_str()
+    now = time.monotonic()
+    
+    slow = _slow_cache.get(coin)
+    slow_data = None
+    if slow is not None:
+        loaded_at, day, data = slow
+        # A missing bias may still be written today, so it is re-read every cycle
+        if day == today_str and data["daily_bias"] is not None and now - loaded_at < SLOW_CACHE_TTL:
+            slow_data = data
+    
+    learning = _cached_patterns(coin, PATTERN_LIMIT, now)
     
     with get_session() as session:
-        # 1. Daily Market Bias (cached)
-        daily_bias = MarketMemoryRepository.get_today(session, coin, today_str)
-        
-        # 2. Performance Metrics (24h)
-        perf_metrics = TradeRepository.get_performance_metrics(session, coin, hours=24)
-        
-        # 3. Last Cycle Reasoning (Thought Continuity)
-        last_logs = InferenceLogRepository.get_recent(session, limit=1)
-        last_thought = last_logs[0] if last_logs else None
-        
-        # 4. Active Trades (Position Memory)
-        stmt = select(Trade).where(Trade.coin == coin).where(Trade.closed_at == None)
-        active_trades = list(session.exec(stmt).all())
-        
-        # 5. Learning Insights (Pattern Analysis)
-        learning = _analyze_patterns(session, coin)
+        fast_data = _preload_fast(session, coin)
+        if slow_data is None:
+            slow_data = _preload_slow(session, coin, today_str)
+            _slow_cache[coin] = (now, today_str, slow_data)
+        if learning is None:
+            # 5. Learning Insights (Pattern Analysis)
+            learning = _analyze_patterns(session, coin, PATTERN_LIMIT)
     
     return {
-        "daily_bias": daily_bias,
-        "performance": perf_metrics,
-        "last_thought": last_thought,
-        "active_trades": active_trades,
+        "daily_bias": slow_data["daily_bias"],
+        "performance": fast_data["performance"],
+        "last_thought": fast_data["last_thought"],
+        "active_trades": fast_data["active_trades"],
         "learning": learning
     }
 
 
-def _analyze_patterns(session, coin: str, limit: int = 30) -> dict:
+async def preload_memory_async(coin: str) -> dict:
+    """
+    Async wrapper for preload_memory: runs the DB reads in a worker thread
+    so callers can overlap them with network fetches (asyncio.gather).
+    """
+    return await asyncio.to_thread(preload_memory, coin)
+
+
+def _cached_patterns(coin: str, limit: int, now: float) -> Optional[dict]:
+    """Memoized patterns for a coin, or None if missing/stale."""
+    cached = _learning_cache.get(coin)
+    if (cached is not None and now - cached[0] < PATTERN_CACHE_TTL
+            and cached[1] == TradeRepository.get_closed_version(coin) and cached[2] == limit):
+        return cached[3]
+    return None
+
+
+def _analyze_patterns(session, coin: str, limit: int = PATTERN_LIMIT) -> dict:
     """
-    Analyze closed trades to extract learning patterns.
+    Analyze closed trades to extract learning patterns and memoize them
+    (read back via _cached_patterns for PATTERN_CACHE_TTL seconds, or until
+    a trade for that coin is closed through TradeRepository.close_trade).
+    """
+    now = time.monotonic()
+    version = TradeRepository.get_closed_version(coin)
+    patterns = _compute_patterns(session, coin, limit)
+    _learning_cache[coin] = (now, version, limit, patterns)
+    return patterns
+
+
+def _count_outcomes(trades: list) -> tuple[int, int, int, int, int]:
     """
-    # Get recent closed trades
-    trades = TradeRepository.get_closed_trades(session, coin, limit=limit)
+    Count (n_long, n_short, long_wins, short_wins, wins) over
+    (direction code, win flag) rows.
+    """
+    # Single pass, indexed by Direction code
+    counts = [0, 0]
+    dir_wins = [0, 0]
+    wins = 0
+    for direction, win in trades:
+        if direction >= 0:
+            counts[direction] += 1
+            dir_wins[direction] += win
+        wins += win
+    return counts[0], counts[1], dir_wins[0], dir_wins[1], wins
+
+
+def _compute_patterns(session, coin: str, limit: int) -> dict:
+    """Compute win-rate patterns over the most recent closed trades."""
+    # Get (direction, win) for recent closed trades
+    trades = TradeRepository.get_pattern_stats(session, coin, limit=limit)
     
     if not trades:
         return {
@@ -68,32 +170,25 @@ def _analyze_patterns(session, coin: str, limit: int = 30) -> dict:
             "recommendation": "Insufficient data for learning."
         }
     
-    # Calculate metrics
-    wins = [t for t in trades if (t.pnl_usd or 0) > 0]
-    longs = [t for t in trades if t.direction == "LONG"]
-    shorts = [t for t in trades if t.direction == "SHORT"]
-    
-    long_wins = len([t for t in longs if (t.pnl_usd or 0) > 0])
-    short_wins = len([t for t in shorts if (t.pnl_usd or 0) > 0])
-    
-    long_wr = (long_wins / len(longs) * 100) if longs else 0
-    short_wr = (short_wins / len(shorts) * 100) if shorts else 0
+    n_long, n_short, long_wins, short_wins, wins = _count_outcomes(trades)
+    long_wr = (long_wins / n_long * 100) if n_long else 0
+    short_wr = (short_wins / n_short * 100) if n_short else 0
     
     best_direction = "LONG" if long_wr > short_wr else "SHORT"
     
     # Generate recommendation
     if len(trades) < 5:
         recommendation = "Insufficient trades for reliable patterns."
-    elif long_wr > 60 and len(longs) >= 5:
+    elif long_wr > 60 and n_long >= 5:
         recommendation = f"LONG positions performing well ({long_wr:.0f}% WR). Favor bullish setups."
-    elif short_wr > 60 and len(shorts) >= 5:
+    elif short_wr > 60 and n_short >= 5:
         recommendation = f"SHORT positions performing well ({short_wr:.0f}% WR). Favor bearish setups."
     else:
         recommendation = "No strong directional edge detected. Prioritize high-confluence setups."
     
     return {
         "sample_size": len(trades),
-        "overall_win_rate": len(wins) / len(trades) * 100,
+        "overall_win_rate": wins / len(trades) * 100,
         "long_win_rate": long_wr,
         "short_win_rate": short_wr,
         "best_direction": best_direction,
@@ -101,52 +196,74 @@ def _analyze_patterns(session, coin: str, limit: int = 30) -> dict:
     }
 
 
+# Context block templates (%-style, formatted per cycle)
+_BIAS_TMPL = """## 🧠 DAILY BIAS (Cached)
+- Bias: %s
+- Volatility: %s/100
+"""
+
+_PERF_TMPL = """## 📊 TODAY'S PERFORMANCE
+- Win Rate: %.1f%%
+- PnL: $%.2f
+- Trades: %s
+"""
+
+_THOUGHT_TMPL = """## 💭 LAST CYCLE THOUGHT
+"%s..."
+"""
+
+_ACTIVE_TMPL = """## 📈 ACTIVE POSITIONS (Your Thesis)
+%s
+"""
+
+_ACTIVE_LINE_TMPL = "- %s %s @ %s: %s..."
+
+_LEARNING_TMPL = """## 🎓 LEARNED PATTERNS (%s trades)
+- Long WR: %.0f%%
+- Short WR: %.0f%%
+- Recommendation: %s
+"""
+
+
 def format_memory_context(memory: dict) -> str:
     """
     Format memory into a string for LLM injection.
     """
     parts = []
+    append = parts.append
     
     # Daily Bias
-    if memory["daily_bias"]:
-        parts.append(f"""## 🧠 DAILY BIAS (Cached)
-- Bias: {memory['daily_bias'].market_bias}
-- Volatility: {memory['daily_bias'].volatility_score}/100
-""")
+    bias = memory["daily_bias"]
+    if bias:
+        append(_BIAS_TMPL % (bias.market_bias, bias.volatility_score))
     
     # Performance
     perf = memory["performance"]
-    parts.append(f"""## 📊 TODAY'S PERFORMANCE
-- Win Rate: {perf['win_rate']:.1f}%
-- PnL: ${perf['total_pnl_usd']:.2f}
-- Trades: {perf['total_trades']}
-""")
+    append(_PERF_TMPL % (perf['win_rate'], perf['total_pnl_usd'], perf['total_trades']))
     
     # Last Thought
     if memory["last_thought"]:
         thought = memory["last_thought"].analyst_reasoning or ""
         if len(thought) > 20:
-            parts.append(f"""## 💭 LAST CYCLE THOUGHT
-"{thought[:250]}..."
-""")
-    
-    # Active Trades
-    if memory["active_trades"]:
-        trades_str = "\n".join([
-            f"- {t.direction} {t.coin} @ {t.entry_price}: {t.reasoning[:80]}..."
-            for t in memory["active_trades"]
-        ])
-        parts.append(f"""## 📈 ACTIVE POSITIONS (Your Thesis)
-{trades_str}
-""")
+            append(_THOUGHT_TMPL % thought)
+    
+    # Active Trades (reasoning / thought already truncated in SQL, see repository)
+    active_trades = memory["active_trades"]
+    if active_trades:
+        trades_str = "\n".join(
+            _ACTIVE_LINE_TMPL % (t.direction, t.coin, t.entry_price, t.reasoning or "")
+            for t in active_trades
+        )
+        append(_ACTIVE_TMPL % trades_str)
     
     # Learning
     learning = memory["learning"]
     if learning["sample_size"] >= 3:
-        parts.append(f"""## 🎓 LEARNED PATTERNS ({learning['sample_size']} trades)
-- Long WR: {learning['long_win_rate']:.0f}%
-- Short WR: {learning['short_win_rate']:.0f}%
-- Recommendation: {learning['recommendation']}
-""")
+        append(_LEARNING_TMPL % (
+            learning['sample_size'],
+            learning['long_win_rate'],
+            learning['short_win_rate'],
+            learning['recommendation']
+        ))
     
     return "\n".join(parts)
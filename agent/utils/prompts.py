@@ -5,6 +5,8 @@ Prompts for Market Analyst and Risk Manager agents.
 Execution logic is embedded in the system prompt.
 """
 
+import functools
+
 ANALYST_PROMPT = """You are an AGGRESSIVE Crypto Trader at a proprietary trading desk.
 Your mandate: **FIND TRADES. TAKE ACTION.** Indecision is failure. HOLD is only valid when data is truly conflicting.
 
@@ -205,11 +207,18 @@ def get_risk_prompt() -> str:
     return RISK_PROMPT
 
 
+@functools.lru_cache(maxsize=8)
 def get_merge_prompt(auto_approve_usd: float = 100.0) -> str:
-    """Get the merge node system prompt."""
+    """Get the merge node system prompt (memoized per auto_approve_usd)."""
     return MERGE_PROMPT.format(auto_approve_usd=auto_approve_usd)
 
 
+@functools.lru_cache(maxsize=4)
+def _tools_block(tools: tuple[str, ...]) -> str:
+    """Render the tool list (memoized; the MCP tool set rarely changes)."""
+    return "\n".join(f"- `{t}`" for t in tools)
+
+
 def build_system_context(
     account_state: dict,
     active_exit_plans: str,
@@ -217,23 +226,20 @@ def build_system_context(
     active_trade_context: str = ""
 ) -> str:
     """Build the full context section for system prompts."""
-    tools_str = "\\n".join(f"- `{t}`" for t in tool_list)
-    
-    context = f"""
+    header = f"""
 ## Current Account State
 Equity: ${account_state.get('equity', 0):,.2f}
 Margin Used: {account_state.get('margin_usage_pct', 0):.1f}%
 Open Positions: {account_state.get('positions', 0)}
 Risk Level: {account_state.get('risk_level', 'UNKNOWN')}
 
-{active_exit_plans}
-"""
-
-    if active_trade_context:
-        context += f"\n{active_trade_context}\n"
-
-    context += f"""
-## Available Tools
-{tools_str}
 """
-    return context
+    return "".join([
+        header,
+        active_exit_plans,
+        "\n",
+        f"\n{active_trade_context}\n" if active_trade_context else "",
+        "\n## Available Tools\n",
+        _tools_block(tuple(tool_list)),
+        "\n"
+    ])
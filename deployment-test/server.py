@@ -6,47 +6,122 @@ from hyperliquid.info import Info
 from hyperliquid.exchange import Exchange
 from hyperliquid.utils import constants
 import eth_account
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import math
+import numpy as np
 import sys
 import time
 import functools
+import heapq
 import traceback
 import datetime
-import json
+import orjson
+import queue
+import threading
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+
+# Trade log lines carry raw SDK responses (may hold non-str keys / odd types)
+def _json_dumps(obj) -> str:
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
 
 
 
 # Global Logger
 class AgentLogger:
+    """
+    File logger for tool calls. Callers only format the line and enqueue it;
+    a daemon writer thread owns the (buffered, per-day) file handles, so no
+    open/write/close happens on the request path.
+    """
+    BUFFER_SIZE = 64 * 1024
+    FLUSH_INTERVAL = 1.0  # seconds
+    SUMMARIZE_OVER = 50  # dict/list results larger than this are logged as a summary
+    _STOP = object()
+
     def __init__(self, log_dir="logs"):
         self.log_dir = log_dir
         self.ensure_log_dir()
+        self._queue = queue.SimpleQueue()
+        self._handles = {}  # base_name -> (date_str, file); writer thread only
+        self._writer = threading.Thread(target=self._write_loop, name="agent-logger", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
 
     def ensure_log_dir(self):
         if not os.path.exists(self.log_dir):
             os.makedirs(self.log_dir)
 
-    def _get_filepath(self, base_name):
-        date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+    def _get_filepath(self, base_name, date_str=None):
+        date_str = date_str or datetime.datetime.now().strftime("%Y-%m-%d")
         filename = f"{date_str}_{base_name}"
         return os.path.join(self.log_dir, filename)
 
+    def _get_handle(self, base_name):
+        """Get the open handle for today's file, rotating when the date changes."""
+        date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+        current = self._handles.get(base_name)
+        if current is not None:
+            if current[0] == date_str:
+                return current[1]
+            current[1].close()
+        handle = open(self._get_filepath(base_name, date_str), "a", buffering=self.BUFFER_SIZE)
+        self._handles[base_name] = (date_str, handle)
+        return handle
+
+    def _flush_all(self):
+        for _, handle in self._handles.values():
+            try:
+                handle.flush()
+            except Exception as e:
+                print(f"Failed to flush log: {e}", file=sys.stderr)
+
+    def _write_loop(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.FLUSH_INTERVAL)
+            except queue.Empty:
+                item = None
+
+            if item is self._STOP:
+                self._flush_all()
+                return
+
+            if item is not None:
+                base_name, line = item
+                try:
+                    self._get_handle(base_name).write(line)
+                except Exception as e:
+                    print(f"Failed to write to {base_name}: {e}", file=sys.stderr)
+
+            now = time.monotonic()
+            if item is None or now - last_flush >= self.FLUSH_INTERVAL:
+                self._flush_all()
+                last_flush = now
+
+    def close(self):
+        """Drain queued lines and flush files (registered with atexit)."""
+        if self._writer.is_alive():
+            self._queue.put(self._STOP)
+            self._writer.join(timeout=5)
+
     def log(self, tool, action, result, args=None, kwargs=None):
         """Log general actions in a human-readable format."""
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # Simplified Human-Readable Format
         args_str = f"Args: {args}, Kwargs: {kwargs}" if args or kwargs else ""
-        result_str = str(result)[:200] + "..." if len(str(result)) > 200 else str(result)
+        if isinstance(result, (dict, list)) and len(result) > self.SUMMARIZE_OVER:
+            # Only 200 chars are kept anyway; don't stringify e.g. all_mids/user_fills in full
+            result_str = f"<{type(result).__name__} len={len(result)}>"
+        else:
+            text = str(result)
+            result_str = text[:200] + "..." if len(text) > 200 else text
         
         entry = f"[{timestamp}] [{tool}] {action} | {args_str} -> Result: {result_str}\n"
-        
-        filepath = self._get_filepath("agent_actions.log")
-        try:
-            with open(filepath, "a") as f:
-                f.write(entry)
-        except Exception as e:
-            print(f"Failed to write to main log: {e}", file=sys.stderr)
+        self._queue.put(("agent_actions.log", entry))
 
     def log_trade(self, tool, action, result, args=None, kwargs=None):
         """Log trade-specific actions in a structured format for learning."""
@@ -58,53 +133,66 @@ class AgentLogger:
             "action": action,
             "args": str(args) if args else None,
             "kwargs": str(kwargs) if kwargs else None,
-            "result": str(result)
+            "result": result  # kept structured; non-JSON values fall back to str()
         }
-        
-        filepath = self._get_filepath("trades.log")
-        try:
-            with open(filepath, "a") as f:
-                f.write(json.dumps(entry) + "\n")
-        except Exception as e:
-            print(f"Failed to write to trade log: {e}", file=sys.stderr)
+        self._queue.put(("trades.log", _json_dumps(entry) + "\n"))
+
+# Tool Decorator: logging + error handling in a single frame
+TRADE_TOOL_PREFIXES = ("place_", "cancel_", "close_", "update_")
+
+def tool_wrapper(func):
+    tool_name = func.__name__
+    # Trade tools also go to the structured trade log (fixed per tool, so decided once)
+    is_trade = tool_name.startswith(TRADE_TOOL_PREFIXES)
 
-# Logging Decorator
-def log_action(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        tool_name = func.__name__
         try:
             res = func(*args, **kwargs)
-            
-            # 1. General Log (Human Readable)
-            agent_logger.log(tool_name, "CALLED", res, args, kwargs)
-            
-            # 2. Trade Log (Structured) - Filter for trade tools
-            if any(prefix in tool_name for prefix in ["place_", "cancel_", "close_", "update_"]):
-                agent_logger.log_trade(tool_name, "EXECUTED", res, args, kwargs)
-                
-            return res
         except Exception as e:
-            # Log failure
             agent_logger.log(tool_name, "ERROR", str(e), args, kwargs)
-            raise e
+            if is_trade:
+                # A failed trade call may still have changed account state
+                _invalidate_user_state()
+                agent_logger.log_trade(tool_name, "ERROR", str(e), args, kwargs)
+            log(f"Error in {tool_name}: {e}")
+            traceback.print_exc(file=sys.stderr)
+            return f"Error: {str(e)}"
+
+        # 1. General Log (Human Readable)
+        agent_logger.log(tool_name, "CALLED", res, args, kwargs)
+
+        # 2. Trade Log (Structured)
+        if is_trade:
+            # Account state changed; don't serve the cached snapshot to the next decision
+            _invalidate_user_state()
+            agent_logger.log_trade(tool_name, "EXECUTED", res, args, kwargs)
+
+        return res
     return wrapper
 
 # Caching Decorator
 def ttl_cache(seconds: int):
     def decorator(func):
         cache = {}
+        # Pre-bound for the hit path
+        cache_get = cache.get
+        time_monotonic = time.monotonic
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            key = str(args) + str(kwargs)
-            now = time.time()
-            if key in cache:
-                val, timestamp = cache[key]
-                if now - timestamp < seconds:
-                    return val
+            # The args tuple itself is the key; kwargs only add a sorted tuple when present
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            try:
+                entry = cache_get(key)
+            except TypeError:  # unhashable argument; bypass the cache
+                return func(*args, **kwargs)
+            now = time_monotonic()
+            if entry is not None and entry[1] > now:
+                return entry[0]
             res = func(*args, **kwargs)
-            cache[key] = (res, now)
+            cache[key] = (res, now + seconds)
             return res
+        wrapper.cache_clear = cache.clear
         return wrapper
     return decorator
 
@@ -118,48 +206,66 @@ agent_logger = AgentLogger()
 
 # Global Precision Manager
 class PrecisionManager:
+    """
+    Exchange metadata for size/price rounding. Perp meta is warmed once at
+    server startup (and loaded on first use otherwise); spot meta only if asked for.
+    """
+    # After a failed load, wait this long before hitting info.meta() again
+    LOAD_RETRY_SECONDS = 30.0
+
     def __init__(self, info_client):
         self.info = info_client
-        self.meta = None
-        self.spot_meta = None
-        self.coin_map = {} # coin -> asset info
+        self._meta = None
+        self._spot_meta = None
+        # Flat per-coin store instead of keeping every full asset dict
+        self._sz_decimals = None # coin -> szDecimals (hot path for round_sz)
+        self._retry_at = 0.0 # monotonic time before which load() is not retried
+
+    @property
+    def meta(self):
+        if self._meta is None:
+            self._meta = self.info.meta()
+        return self._meta
+
+    @property
+    def spot_meta(self):
+        if self._spot_meta is None:
+            self._spot_meta = self.info.spot_meta()
+        return self._spot_meta
+
+    @property
+    def sz_decimals(self) -> dict:
+        if self._sz_decimals is None and time.monotonic() >= self._retry_at:
+            self.load()
+        return self._sz_decimals or {}
 
     def load(self):
+        """Fetch and index the perp universe (called lazily; safe to call early to warm up)."""
         print("[MCP] Loading exchange metadata...", file=sys.stderr)
         try:
-            self.meta = self.info.meta()
-            self.spot_meta = self.info.spot_meta()
-            
             # Index perp universe
-            for asset in self.meta["universe"]:
-                self.coin_map[asset["name"]] = asset
+            universe = self.meta["universe"]
+            self._sz_decimals = {asset["name"]: asset["szDecimals"] for asset in universe}
                 
             print("[MCP] Metadata loaded.", file=sys.stderr)
         except Exception as e:
+            # Left unset so a later order retries (after a backoff); rounding falls back to heuristics meanwhile
+            self._retry_at = time.monotonic() + self.LOAD_RETRY_SECONDS
             print(f"[MCP] Failed to load metadata: {e}", file=sys.stderr)
 
     def round_px(self, coin: str, px: float) -> float:
-        # Basic heuristic fallback if meta not loaded or coin not found
-        if not self.meta or coin not in self.coin_map:
-            return self._heuristic_round_px(px)
-        
-        asset = self.coin_map[coin]
         # Hyperliquid uses significant figures or specific tick sizes. 
         # The SDK/API usually handles standard rounding, but let's be safe.
         # Max decimals depends on szDecimals usually, but price is different.
         # For simplicity and robustness, we'll stick to the heuristic which works well for HL,
         # OR implementation specific logic if we had exact tick size.
-        # The 'universe' metadata has 'szDecimals' but not explicit 'tickSize'.
-        # However, the SDK's internal logic often relies on significant figures.
+        # The 'universe' metadata has 'szDecimals' but not explicit 'tickSize',
+        # so there is no per-coin value to look up here.
         return self._heuristic_round_px(px)
 
     def round_sz(self, coin: str, sz: float) -> float:
-        if not self.meta or coin not in self.coin_map:
-            return round(sz, 5)
-        
-        asset = self.coin_map[coin]
-        decimals = asset["szDecimals"]
-        return round(sz, decimals)
+        decimals = self.sz_decimals.get(coin)
+        return round(sz, decimals if decimals is not None else 5)
 
     def _heuristic_round_px(self, px: float) -> float:
         if px == 0: return 0.0
@@ -167,8 +273,6 @@ class PrecisionManager:
         if px >= 1: return round(px, 5) # General safe bet
         return round(px, 6) # For low cap coins
 
-# Initialize later
-pm = None
 
 # Load environment variables
 load_dotenv()
@@ -186,6 +290,7 @@ if not PUBLIC_ADDRESS or not PRIVATE_KEY:
 # Initialize Hyperliquid SDK
 # Initialize Hyperliquid SDK
 info = Info(BASE_URL, skip_ws=True)
+pm = PrecisionManager(info)  # warmed in __main__; loads on first use otherwise
 account = eth_account.Account.from_key(PRIVATE_KEY)
 agent_address = account.address
 
@@ -205,6 +310,27 @@ else:
 
 exchange = Exchange(account, BASE_URL, account_address=PUBLIC_ADDRESS)
 
+# HTTP connection pooling: every tool is bound by REST round-trips to Hyperliquid,
+# so keep a larger keep-alive pool on the SDK's requests.Session (Info/Exchange
+# both expose it as .session). Only read-only Info calls are retried; order
+# POSTs are never replayed.
+def _mount_pool(client, max_retries):
+    session = getattr(client, "session", None)
+    if session is None:
+        return
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=max_retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+_mount_pool(info, Retry(
+    total=3,
+    backoff_factor=0.1,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=frozenset({"GET", "POST"}),  # Info endpoints are POSTs
+    raise_on_status=False
+))
+_mount_pool(exchange, 0)
+
 # Initialize MCP Server
 # Initialize MCP Server
 mcp = FastMCP("Hyperliquid MCP Server", dependencies=[], host="0.0.0.0", port=8000)
@@ -213,22 +339,51 @@ def log(msg: str):
     """Log message to stderr for verbose output."""
     print(f"[MCP] {msg}", file=sys.stderr)
 
-def handle_errors(func):
-    """Decorator to catch errors and return them as strings."""
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        try:
-            # Auto-log success
-            res = func(*args, **kwargs)
-            # We can't easily log args here without potentially leaking sensitive info or being too verbose,
-            # but we can log the tool name.
-            # For specific actions, we'll call agent_logger inside the tool.
-            return res
-        except Exception as e:
-            log(f"Error in {func.__name__}: {e}")
-            traceback.print_exc(file=sys.stderr)
-            return f"Error: {str(e)}"
-    return wrapper
+# Shared market snapshot (universe + asset contexts) for the market-data tools,
+# with a coin -> index map built once per refresh
+@ttl_cache(seconds=5)
+def _cached_meta_and_ctxs():
+    meta, ctxs = info.meta_and_asset_ctxs()
+    coin_idx = {a["name"]: i for i, a in enumerate(meta["universe"])}
+    return meta, ctxs, coin_idx
+
+HOUR_MS = 3_600_000
+
+# Closed hourly candles per coin for the current hour: coin -> (hour_bucket, candles).
+# Closed candles never change, so repeated profile/correlation calls within the
+# same hour reuse them; the in-progress candle is always fetched fresh.
+# (Clear _closed_candles to force a refetch.)
+_closed_candles: dict[str, tuple[int, tuple]] = {}
+
+def _hourly_candles_24h(coin: str) -> list:
+    """Last 24 hourly candles: 23 closed (cached for the hour) + the live one."""
+    now_ms = int(time.time() * 1000)
+    hour_bucket = now_ms // HOUR_MS
+    hour_start = hour_bucket * HOUR_MS
+    
+    cached = _closed_candles.get(coin)
+    if cached is not None and cached[0] == hour_bucket:
+        closed = cached[1]
+    else:
+        closed = tuple(
+            x for x in info.candles_snapshot(coin, "1h", hour_start - 23 * HOUR_MS, hour_start - 1)
+            if x["t"] < hour_start
+        )
+        # Only a full window is kept; empty/partial responses are refetched next call
+        if len(closed) == 23:
+            _closed_candles[coin] = (hour_bucket, closed)
+    
+    live = [x for x in info.candles_snapshot(coin, "1h", hour_start, now_ms) if x["t"] >= hour_start]
+    return [*closed, *live]
+
+# Account snapshot shared by the account/risk/sizing tools within a short burst.
+# Invalidated after any state-changing tool (see tool_wrapper, transfer).
+@ttl_cache(seconds=1)
+def _cached_user_state():
+    return info.user_state(PUBLIC_ADDRESS)
+
+def _invalidate_user_state():
+    _cached_user_state.cache_clear()
 
 # Precision Manager handles rounding now.
 # We keep this for backward compatibility if needed, but it should ideally be removed.
@@ -238,8 +393,7 @@ def round_price(px: float) -> float:
     return float(px)
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_all_mids() -> dict:
     """
     Get current mid prices for all assets.
@@ -249,8 +403,7 @@ def get_all_mids() -> dict:
     return info.all_mids()
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_l2_snapshot(coin: str) -> dict:
     """
     Get L2 order book snapshot for a specific coin.
@@ -260,8 +413,7 @@ def get_l2_snapshot(coin: str) -> dict:
     return info.l2_snapshot(coin)
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_candles(coin: str, interval: str, start_time: int, end_time: int) -> list:
     """
     Get historical candles for a specific coin.
@@ -280,8 +432,7 @@ def get_candles(coin: str, interval: str, start_time: int, end_time: int) -> lis
 
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_account_info(type: str = "perp") -> dict:
     """
     Get account info (balances, margin, positions).
@@ -293,11 +444,10 @@ def get_account_info(type: str = "perp") -> dict:
         return info.spot_user_state(PUBLIC_ADDRESS)
     
     log("Fetching perp user state...")
-    return info.user_state(PUBLIC_ADDRESS)
+    return _cached_user_state()
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_user_funding_history(start_time: int, end_time: int = None) -> list:
     """
     Get the user's funding history.
@@ -308,8 +458,7 @@ def get_user_funding_history(start_time: int, end_time: int = None) -> list:
     return info.user_funding_history(PUBLIC_ADDRESS, start_time, end_time)
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_user_fills() -> list:
     """
     Get the user's trade history (fills).
@@ -319,8 +468,7 @@ def get_user_fills() -> list:
 
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_historical_orders() -> list:
     """
     Get the user's historical orders.
@@ -328,8 +476,7 @@ def get_historical_orders() -> list:
     return info.historical_orders(PUBLIC_ADDRESS)
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_exchange_meta(type: str = "perp") -> dict:
     """
     Get exchange metadata (universe, tokens).
@@ -341,8 +488,7 @@ def get_exchange_meta(type: str = "perp") -> dict:
     return info.meta()
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_funding_history(coin: str, start_time: int, end_time: int = None) -> list:
     """
     Get global funding history for a specific coin.
@@ -350,8 +496,7 @@ def get_funding_history(coin: str, start_time: int, end_time: int = None) -> lis
     return info.funding_history(coin, start_time, end_time)
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_open_orders() -> list:
     """
     Get all open orders for the user.
@@ -362,8 +507,7 @@ def get_open_orders() -> list:
     return info.frontend_open_orders(PUBLIC_ADDRESS)
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def place_order(coin: str, is_buy: bool, sz: float, limit_px: float, order_type: str = "limit", reduce_only: bool = False) -> dict:
     """
     Place a new order on Hyperliquid.
@@ -396,8 +540,7 @@ def place_order(coin: str, is_buy: bool, sz: float, limit_px: float, order_type:
     return order_result
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def cancel_order(coin: str, oid: int) -> dict:
     """
     Cancel an order by its Order ID (oid).
@@ -409,8 +552,7 @@ def cancel_order(coin: str, oid: int) -> dict:
 
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def transfer(amount: float, destination: str, token: str = "USDC") -> dict:
     """
     Transfer assets to another address.
@@ -421,14 +563,16 @@ def transfer(amount: float, destination: str, token: str = "USDC") -> dict:
     """
     if token.upper() == "USDC":
         log(f"Transferring {amount} USDC to {destination}...")
-        return exchange.usd_transfer(amount, destination)
+        res = exchange.usd_transfer(amount, destination)
+    else:
+        log(f"Transferring {amount} {token} (Spot) to {destination}...")
+        res = exchange.spot_transfer(amount, destination, token)
     
-    log(f"Transferring {amount} {token} (Spot) to {destination}...")
-    return exchange.spot_transfer(amount, destination, token)
+    _invalidate_user_state()
+    return res
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def update_isolated_margin(coin: str, amount: float) -> dict:
     """
     Add or remove margin from an isolated position.
@@ -443,8 +587,7 @@ def update_isolated_margin(coin: str, amount: float) -> dict:
 
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def schedule_cancel(time_ms: int = None) -> dict:
     """
     Schedule a "Dead Man's Switch" cancel.
@@ -453,10 +596,20 @@ def schedule_cancel(time_ms: int = None) -> dict:
     """
     return exchange.schedule_cancel(time_ms)
 
-@mcp.tool()
-@log_action
-@handle_errors
+def _order_status_text(status) -> str:
+    """One-line summary of a single entry in an order response's 'statuses'."""
+    if not isinstance(status, dict):
+        return str(status)
+    if "error" in status:
+        return f"error - {status['error']}"
+    if "resting" in status:
+        return f"resting (oid {status['resting'].get('oid')})"
+    if "filled" in status:
+        return f"filled (oid {status['filled'].get('oid')})"
+    return str(status)
 
+@mcp.tool()
+@tool_wrapper
 def place_smart_order(coin: str, is_buy: bool, size: float, size_type: str = "usd", limit_px: float = None, sl_pct: float = None, tp_pct: float = None, leverage: int = None) -> dict:
     """
     Place a smart order with flexible sizing and optional TP/SL.
@@ -471,7 +624,7 @@ def place_smart_order(coin: str, is_buy: bool, size: float, size_type: str = "us
         leverage: Optional leverage to set before trade
     """
     # 1. Handle Leverage - FORCE SET before trade
-    if leverage:
+    if leverage is not None and leverage > 0:
         log(f"Setting leverage to {leverage}x for {coin}")
         try:
             # Use cross-margin mode (is_cross=True) for maximum leverage
@@ -495,7 +648,7 @@ def place_smart_order(coin: str, is_buy: bool, size: float, size_type: str = "us
     if size_type.lower() == "usd":
         final_sz = size / exec_px
     elif size_type.lower() == "pct":
-        state = info.user_state(PUBLIC_ADDRESS)
+        state = _cached_user_state()
         equity = float(state["marginSummary"]["accountValue"])
         usd_size = equity * size
         final_sz = usd_size / exec_px
@@ -539,42 +692,59 @@ def place_smart_order(coin: str, is_buy: bool, size: float, size_type: str = "us
         return f"Error: Entry order failed via API. Response: {res}"
 
     # 4. Handle TP/SL (Trigger Orders) ONLY if Entry Succeeded
+    # Both triggers go out in one signed bulk request
     if (sl_pct or tp_pct) and entry_success:
-        import time
-        time.sleep(0.5) # Brief pause to ensure sequence
-        
         entry_px = limit_px if limit_px else mid_px
         close_is_buy = not is_buy
         
-        triggered_orders = []
+        trigger_orders = []
+        trigger_labels = []
         
         if sl_pct:
             sl_price = entry_px * (1 - sl_pct) if is_buy else entry_px * (1 + sl_pct)
             sl_price = pm.round_px(coin, sl_price)
             log(f"Placing Smart SL @ {sl_price}")
-            sl_res = exchange.order(coin, close_is_buy, final_sz, sl_price, 
-                           {"trigger": {"triggerPx": sl_price, "isMarket": True, "tpsl": "sl"}}, 
-                           reduce_only=True)
-            triggered_orders.append(f"SL: {sl_res['status']}")
+            trigger_orders.append({
+                "coin": coin, "is_buy": close_is_buy, "sz": final_sz, "limit_px": sl_price,
+                "order_type": {"trigger": {"triggerPx": sl_price, "isMarket": True, "tpsl": "sl"}},
+                "reduce_only": True
+            })
+            trigger_labels.append("SL")
             
         if tp_pct:
             tp_price = entry_px * (1 + tp_pct) if is_buy else entry_px * (1 - tp_pct)
             tp_price = pm.round_px(coin, tp_price)
             log(f"Placing Smart TP @ {tp_price}")
-            tp_res = exchange.order(coin, close_is_buy, final_sz, tp_price, 
-                           {"trigger": {"triggerPx": tp_price, "isMarket": True, "tpsl": "tp"}}, 
-                           reduce_only=True)
-            triggered_orders.append(f"TP: {tp_res['status']}")
-            
-    return res
+            trigger_orders.append({
+                "coin": coin, "is_buy": close_is_buy, "sz": final_sz, "limit_px": tp_price,
+                "order_type": {"trigger": {"triggerPx": tp_price, "isMarket": True, "tpsl": "tp"}},
+                "reduce_only": True
+            })
+            trigger_labels.append("TP")
+        
+        trigger_res = exchange.bulk_orders(trigger_orders)
+        # The envelope status only says the batch was accepted; each order
+        # has its own resting/error entry in the same order as submitted
+        if trigger_res.get("status") == "ok":
+            statuses = trigger_res.get("response", {}).get("data", {}).get("statuses", [])
+            triggered_orders = [
+                f"{label}: {_order_status_text(statuses[i]) if i < len(statuses) else 'no status returned'}"
+                for i, label in enumerate(trigger_labels)
+            ]
+        else:
+            triggered_orders = [f"{label}: error - {trigger_res.get('response')}" for label in trigger_labels]
+        if any(": error" in t for t in triggered_orders):
+            print(f"[SmartOrder] Trigger orders failed: {triggered_orders}", file=sys.stderr)
+        
+        # Keep the entry response shape; attach trigger outcomes alongside it
+        return {**res, "triggers": triggered_orders}
             
     return res
 
 
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def close_position(coin: str, percentage: float = 1.0) -> dict:
     """
     Close a position (or part of it).
@@ -582,7 +752,7 @@ def close_position(coin: str, percentage: float = 1.0) -> dict:
         coin: Coin symbol
         percentage: Percentage to close (0.0 to 1.0, default 1.0 for 100%)
     """
-    state = info.user_state(PUBLIC_ADDRESS)
+    state = _cached_user_state()
     positions = state["assetPositions"]
     target_pos = None
     for p in positions:
@@ -608,14 +778,13 @@ def close_position(coin: str, percentage: float = 1.0) -> dict:
     return res
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 @ttl_cache(seconds=2)
 def get_account_health() -> dict:
     """
     Get account health metrics.
     """
-    state = info.user_state(PUBLIC_ADDRESS)
+    state = _cached_user_state()
     margin = state["marginSummary"]
     equity = float(margin["accountValue"])
     used = float(margin["totalMarginUsed"])
@@ -637,13 +806,12 @@ def get_account_health() -> dict:
     return health
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_max_trade_size(coin: str, leverage: int = 20) -> dict:
     """
     Calculate max trade size for a coin based on current equity and leverage.
     """
-    state = info.user_state(PUBLIC_ADDRESS)
+    state = _cached_user_state()
     equity = float(state["marginSummary"]["accountValue"])
     
     max_usd = equity * leverage
@@ -664,13 +832,12 @@ def get_max_trade_size(coin: str, leverage: int = 20) -> dict:
     }
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_position_risk(coin: str) -> dict:
     """
     Get risk metrics for a specific position.
     """
-    state = info.user_state(PUBLIC_ADDRESS)
+    state = _cached_user_state()
     positions = state["assetPositions"]
     target = None
     for p in positions:
@@ -702,49 +869,43 @@ def get_position_risk(coin: str) -> dict:
     }
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 @ttl_cache(seconds=10)
 def get_market_leaders(limit: int = 10) -> list:
     # meta_and_asset_ctxs returns tuple (universe, contexts)
     # contexts has 'dayNtlVlm', 'markPx', 'prevDayPx', 'funding'
-    meta, ctxs = info.meta_and_asset_ctxs()
+    meta, ctxs, _ = _cached_meta_and_ctxs()
+    
+    # Pick the top volumes first so result dicts are only built for those
+    # (nlargest with a key keeps the stable-sort order on ties)
+    vols = [float(ctxs[i]["dayNtlVlm"]) for i in range(len(meta["universe"]))]
+    top = heapq.nlargest(limit, range(len(vols)), key=vols.__getitem__)
     
     assets = []
-    for i, asset in enumerate(meta["universe"]):
+    for i in top:
         ctx = ctxs[i]
-        name = asset["name"]
-        vol = float(ctx["dayNtlVlm"])
         curr = float(ctx["markPx"])
         prev = float(ctx["prevDayPx"])
         change_pct = ((curr - prev) / prev) * 100 if prev > 0 else 0
         
         assets.append({
-            "coin": name,
-            "volume_24h": vol,
+            "coin": meta["universe"][i]["name"],
+            "volume_24h": vols[i],
             "price": curr,
             "change_24h": round(change_pct, 2)
         })
-        
-    # Sort by volume desc
-    assets.sort(key=lambda x: x["volume_24h"], reverse=True)
-    return assets[:limit]
+    return assets
 
 
 
 @mcp.tool()
-@log_action
-@handle_errors
-
+@tool_wrapper
 @ttl_cache(seconds=60)
 def get_token_analytics(coin: str, interval: str = "4h") -> dict:
     """
     Get comprehensive technical analysis for a token.
     Includes: Price, Volatility, Trend (ADX), Key Levels (Swings), RSI, EMA, Funding Rate.
     """
-    import time
-    import math
-    
     # 1. Fetch Data
     end = int(time.time() * 1000)
     # Lookback for Swings (50 candles), ADX (50 candles), EMA/RSI (20/14 candles)
@@ -758,39 +919,38 @@ def get_token_analytics(coin: str, interval: str = "4h") -> dict:
         return {"error": "Insufficient data"}
         
     # 2. Parse Data
-    closes = [float(c["c"]) for c in candles]
-    highs = [float(c["h"]) for c in candles]
-    lows = [float(c["l"]) for c in candles]
-    current_price = closes[-1]
+    # One pass over the candles; numpy parses the price strings, and
+    # column-major order keeps each of closes/highs/lows contiguous
+    ohlc = np.array([(c["c"], c["h"], c["l"]) for c in candles], dtype=np.float64, order="F")
+    closes, highs, lows = ohlc.T
+    current_price = float(closes[-1])
     
     # 3. Calculate RSI (Simple)
     def calculate_rsi(prices, period=14):
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        avg_gain = sum(d for d in deltas if d > 0) / period
-        avg_loss = -sum(d for d in deltas if d < 0) / period
+        deltas = np.diff(prices)
+        avg_gain = deltas[deltas > 0].sum() / period
+        avg_loss = -deltas[deltas < 0].sum() / period
         if avg_loss == 0: return 100.0
         rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+        return float(100 - (100 / (1 + rs)))
         
     rsi = calculate_rsi(closes[-50:]) # Use last 50 for calculation
     
     # 4. Volatility (StdDev of % returns)
-    returns = [(closes[i] - closes[i-1])/closes[i-1] for i in range(1, len(closes))]
-    mean_ret = sum(returns) / len(returns)
-    variance = sum((r - mean_ret)**2 for r in returns) / len(returns)
-    volatility = math.sqrt(variance) * 100 # In percent
+    returns = np.diff(closes) / closes[:-1]
+    volatility = float(returns.std()) * 100 # In percent
     
     # 5. Key Levels (Swings)
-    recent_high = max(highs[-20:])
-    recent_low = min(lows[-20:])
+    recent_high = float(highs[-20:].max())
+    recent_low = float(lows[-20:].min())
     
     # 6. Trending Status
-    ema_20 = sum(closes[-20:]) / 20 # Simple approx for now
+    ema_20 = float(closes[-20:].mean()) # Simple approx for now
     trend = "BULLISH" if current_price > ema_20 else "BEARISH"
     
     # 7. Funding
-    meta, ctxs = info.meta_and_asset_ctxs()
-    idx = next((i for i, a in enumerate(meta["universe"]) if a["name"] == coin), None)
+    meta, ctxs, coin_idx = _cached_meta_and_ctxs()
+    idx = coin_idx.get(coin)
     funding = float(ctxs[idx]["funding"]) if idx is not None else 0.0
     
     return {
@@ -810,17 +970,15 @@ def get_token_analytics(coin: str, interval: str = "4h") -> dict:
 
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 @ttl_cache(seconds=10)
 def get_market_context(coin: str) -> dict:
     """
     Get detailed market context: Funding, Open Interest, Premium, Volume.
     Essential for determining manipulation or crowded trades.
     """
-    meta, ctxs = info.meta_and_asset_ctxs()
-    # Find index
-    idx = next((i for i, a in enumerate(meta["universe"]) if a["name"] == coin), None)
+    meta, ctxs, coin_idx = _cached_meta_and_ctxs()
+    idx = coin_idx.get(coin)
     
     if idx is None:
         return {"error": f"Coin {coin} not found"}
@@ -853,8 +1011,7 @@ def get_market_context(coin: str) -> dict:
 
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def cancel_all_orders() -> dict:
     """PANIC: Cancel ALL open orders (Optimized Batch)."""
     orders = info.open_orders(PUBLIC_ADDRESS)
@@ -871,11 +1028,10 @@ def cancel_all_orders() -> dict:
     return {"cancelled_count": len(cancels), "details": res}
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def close_all_positions() -> dict:
     """PANIC: Close ALL open positions at Market."""
-    state = info.user_state(PUBLIC_ADDRESS)
+    state = _cached_user_state()
     positions = state["assetPositions"]
     
     results = []
@@ -894,9 +1050,15 @@ def close_all_positions() -> dict:
     agent_logger.log("close_all_positions", f"Closed {len(results)} positions", results)
     return {"closed_count": len(results), "details": results}
 
+def _book_levels(levels: list) -> tuple:
+    """Parse L2 levels into (px, sz) float64 arrays."""
+    n = len(levels)
+    px = np.fromiter((float(lvl["px"]) for lvl in levels), dtype=np.float64, count=n)
+    sz = np.fromiter((float(lvl["sz"]) for lvl in levels), dtype=np.float64, count=n)
+    return px, sz
+
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_order_book_analytics(coin: str) -> dict:
     """
     Get order book analytics: Imbalance, Walls, Spread, and Sentiment.
@@ -907,15 +1069,15 @@ def get_order_book_analytics(coin: str) -> dict:
     asks = l2["levels"][1]
     
     # 2. Imbalance (Top 10)
-    top_bids = bids[:10]
-    top_asks = asks[:10]
-    bid_vol = sum(float(b["sz"]) * float(b["px"]) for b in top_bids)
-    ask_vol = sum(float(a["sz"]) * float(a["px"]) for a in top_asks)
+    bid_px, bid_sz = _book_levels(bids[:10])
+    ask_px, ask_sz = _book_levels(asks[:10])
+    bid_vol = float(bid_sz @ bid_px)
+    ask_vol = float(ask_sz @ ask_px)
     imbalance_ratio = bid_vol / ask_vol if ask_vol > 0 else 999.0
     
     # 3. Premia
-    meta, ctxs = info.meta_and_asset_ctxs()
-    idx = next((i for i, a in enumerate(meta["universe"]) if a["name"] == coin), None)
+    meta, ctxs, coin_idx = _cached_meta_and_ctxs()
+    idx = coin_idx.get(coin)
     premia_pct = 0.0
     if idx is not None:
         ctx = ctxs[idx]
@@ -937,53 +1099,37 @@ def get_order_book_analytics(coin: str) -> dict:
 
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_volume_profile_24h(coin: str) -> dict:
 
-    import time
-    end_time = int(time.time() * 1000)
-    start_time = end_time - (24 * 60 * 60 * 1000)
+    candles = _hourly_candles_24h(coin)
     
-    candles = info.candles_snapshot(coin, "1h", start_time, end_time)
+    if not candles:
+        return {"error": "No volume data"}
     
     # Simple TPO / Volume Profile approximation
     # We'll bucket volume by the candle's typical price (H+L+C)/3
-    volume_buckets = {}
-    total_volume = 0
-    
-    for c in candles:
-        px = (float(c["h"]) + float(c["l"]) + float(c["c"])) / 3
-        vol = float(c["v"]) * px # USD Volume
-        bucket = round(px, -1) # Bucket size 10 (adjust as needed)
-        
-        if bucket not in volume_buckets: volume_buckets[bucket] = 0
-        volume_buckets[bucket] += vol
-        total_volume += vol
-        
-    if not volume_buckets:
-        return {"error": "No volume data"}
-
-    sorted_buckets = sorted(volume_buckets.items(), key=lambda x: x[0])
+    hlcv = np.array(
+        [(float(c["h"]), float(c["l"]), float(c["c"]), float(c["v"])) for c in candles],
+        dtype=np.float64,
+    )
+    typical = hlcv[:, :3].mean(axis=1)
+    usd_vol = hlcv[:, 3] * typical # USD Volume
+    bucket = np.round(typical / 10).astype(np.int64) # Bucket size 10 (adjust as needed)
+    base = bucket.min()
+    totals = np.bincount(bucket - base, weights=usd_vol)
+    total_volume = float(usd_vol.sum())
     
     # Find POC (Point of Control) - Price with max volume
-    poc = max(volume_buckets.items(), key=lambda x: x[1])[0]
+    poc = float((base + int(np.argmax(totals))) * 10)
     
     # Find VAH/VAL (Value Area High/Low - 70% of volume)
-    target_vol = total_volume * 0.7
-    current_vol = 0
-    value_area_buckets = []
-    
-    # Sort by volume desc to accumulate "Value Area"
-    by_vol = sorted(volume_buckets.items(), key=lambda x: x[1], reverse=True)
-    for px, vol in by_vol:
-        current_vol += vol
-        value_area_buckets.append(px)
-        if current_vol >= target_vol:
-            break
-            
-    vah = max(value_area_buckets)
-    val = min(value_area_buckets)
+    # Accumulate buckets by volume desc until 70% is covered
+    by_vol = np.argsort(-totals, kind="stable")
+    covered = int(np.searchsorted(np.cumsum(totals[by_vol]), total_volume * 0.7)) + 1
+    value_area = by_vol[:covered]
+    vah = float((base + int(value_area.max())) * 10)
+    val = float((base + int(value_area.min())) * 10)
     
     return {
         "coin": coin,
@@ -1000,67 +1146,51 @@ def get_volume_profile_24h(coin: str) -> dict:
 
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_correlation_matrix(coins: str = "BTC,ETH,SOL,AVAX,DOGE") -> dict:
 
-    import time
-    import math
-    
     coin_list = coins.split(",")
-    end_time = int(time.time() * 1000)
-    start_time = end_time - (24 * 3600 * 1000)
     
-    prices = {}
+    def fetch_closes(c):
+        candles = _hourly_candles_24h(c)
+        return [float(x["c"]) for x in candles]
     
-    # Fetch prices
-    for c in coin_list:
-        candles = info.candles_snapshot(c, "1h", start_time, end_time)
-        # Extract closes
-        closes = [float(x["c"]) for x in candles]
-        # Normalize length (trim to min)
-        prices[c] = closes
+    # Fetch prices concurrently (network-bound; threads overlap the round-trips)
+    with ThreadPoolExecutor(max_workers=min(16, len(coin_list))) as pool:
+        prices = dict(zip(coin_list, pool.map(fetch_closes, coin_list)))
         
+    # Common window: the shortest series (others are trimmed to it below)
     min_len = min(len(p) for p in prices.values())
-    for c in prices: prices[c] = prices[c][-min_len:]
     
-    # Calculate Pearson Corr
+    if min_len < 2:
+        # A coin with fewer than 2 candles has no defined correlation; report 0
+        corr = np.zeros((len(coin_list), len(coin_list)))
+    else:
+        # Pearson for all pairs = dot products of mean-centered, L2-normalized rows (one GEMM)
+        # (flat series have no defined correlation; report 0 as before)
+        series = np.array([prices[c][-min_len:] for c in coin_list], dtype=np.float64)
+        series -= series.mean(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            series /= np.linalg.norm(series, axis=1, keepdims=True)
+        corr = np.nan_to_num(series @ series.T, nan=0.0)
+    
     matrix = {}
-    for c1 in coin_list:
+    for i, c1 in enumerate(coin_list):
         matrix[c1] = {}
-        for c2 in coin_list:
-            if c1 == c2: 
-                matrix[c1][c2] = 1.0
-                continue
-                
-            x = prices[c1]
-            y = prices[c2]
-            n = len(x)
-            
-            sum_x = sum(x)
-            sum_y = sum(y)
-            sum_xy = sum(xi*yi for xi, yi in zip(x, y))
-            sum_x2 = sum(xi**2 for xi in x)
-            sum_y2 = sum(yi**2 for yi in y)
-            
-            numerator = n * sum_xy - sum_x * sum_y
-            denominator = math.sqrt((n * sum_x2 - sum_x**2) * (n * sum_y2 - sum_y**2))
-            
-            corr = numerator / denominator if denominator else 0
-            matrix[c1][c2] = round(corr, 2)
+        for j, c2 in enumerate(coin_list):
+            matrix[c1][c2] = 1.0 if c1 == c2 else round(float(corr[i, j]), 2)
             
     return {"matrix": matrix}
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_open_interest_delta(coin: str) -> dict:
     """
     Get Current Open Interest (OI) and context.
     Note: Historical OI is not available via public API snapshot, so Delta requires polling.
     """
-    meta, ctxs = info.meta_and_asset_ctxs()
-    idx = next((i for i, a in enumerate(meta["universe"]) if a["name"] == coin), None)
+    meta, ctxs, coin_idx = _cached_meta_and_ctxs()
+    idx = coin_idx.get(coin)
     if idx is None: return {"error": "Coin not found"}
     
     ctx = ctxs[idx]
@@ -1076,8 +1206,7 @@ def get_open_interest_delta(coin: str) -> dict:
     }
 
 @mcp.tool()
-@log_action
-@handle_errors
+@tool_wrapper
 def get_hyperliquid_leaderboard() -> dict:
 
     # Try standard leaderboard request
@@ -1112,10 +1241,17 @@ if __name__ == "__main__":
     print(f"Starting Hyperliquid MCP Server...", file=sys.stderr)
     print(f"API URL: {BASE_URL}", file=sys.stderr)
     
-    # Initialize Precision Manager
-    pm = PrecisionManager(info)
+    # Warm exchange metadata so the first order doesn't pay for the fetch
     pm.load()
     
+    # uvloop is optional; FastMCP's anyio runner picks it up via the event loop policy
+    try:
+        import uvloop
+        uvloop.install()
+        print(f"Event loop: uvloop", file=sys.stderr)
+    except ImportError:
+        pass
+    
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("--transport", default="stdio", choices=["stdio", "sse"], help="Transport protocol to use")
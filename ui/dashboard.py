@@ -7,11 +7,19 @@ Run with: streamlit run ui/dashboard.py
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import json
+import orjson
+import sqlite3
 import sys
 import os
+import tempfile
 from zoneinfo import ZoneInfo
 
+# JSON helper
+def _json_pretty(obj) -> str:
+    """Indented JSON for the st.code blocks."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+
 # Timezone helper
 def to_local(dt: datetime) -> datetime:
     """Convert UTC to User Local Time (Asia/Bangkok)."""
@@ -25,7 +33,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agent.db import get_session, InferenceLog, Trade, AgentLog
 from agent.config import get_config
-from sqlmodel import select
+from sqlmodel import select, func
 
 # Page config
 st.set_page_config(
@@ -57,32 +65,135 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-def get_recent_inferences(limit: int = 10):
-    """Fetch recent inference logs from database."""
+# Only the columns the dashboard renders; long text is truncated in SQL
+_INFERENCE_COLUMNS = (
+    InferenceLog.timestamp,
+    InferenceLog.analyst_model,
+    InferenceLog.risk_model,
+    InferenceLog.analyst_signal,
+    func.substr(InferenceLog.analyst_reasoning, 1, 1500).label("analyst_reasoning"),
+    InferenceLog.risk_decision,
+    func.substr(InferenceLog.risk_reasoning, 1, 1500).label("risk_reasoning"),
+    InferenceLog.final_action,
+    InferenceLog.account_equity,
+    InferenceLog.account_margin_pct,
+)
+
+_TRADE_COLUMNS = (
+    Trade.opened_at,
+    Trade.closed_at,
+    Trade.coin,
+    Trade.direction,
+    Trade.entry_price,
+    Trade.size_usd,
+    Trade.leverage,
+    Trade.pnl_usd,
+    Trade.pnl_pct,
+)
+
+_AGENT_LOG_COLUMNS = (
+    AgentLog.id,
+    AgentLog.timestamp,
+    AgentLog.action_type,
+    AgentLog.node_name,
+    func.substr(AgentLog.output, 1, 500).label("output"),
+    func.substr(AgentLog.reasoning, 1, 3000).label("reasoning"),
+    AgentLog.error,
+)
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def get_recent_inferences(limit: int = 10) -> list[dict]:
+    """Fetch recent inference logs from database (JSON fields pre-parsed)."""
     with get_session() as session:
-        stmt = select(InferenceLog).order_by(InferenceLog.timestamp.desc()).limit(limit)
-        return session.exec(stmt).all()
+        stmt = select(*_INFERENCE_COLUMNS).order_by(InferenceLog.timestamp.desc()).limit(limit)
+        rows = [row._asdict() for row in session.exec(stmt).all()]
+    for row in rows:
+        row["analyst_signal"] = parse_json_safe(row["analyst_signal"])
+        row["risk_decision"] = parse_json_safe(row["risk_decision"])
+        # Pretty-printed once here; every expander body is sent on each rerun
+        row["analyst_signal_json"] = _json_pretty(row["analyst_signal"])
+        row["risk_decision_json"] = _json_pretty(row["risk_decision"])
+        # Escape $ to prevent LaTeX rendering (once per fetch, not per rerun)
+        row["analyst_reason_display"] = (row["analyst_reasoning"] or "").replace("$", "\\$")
+        row["risk_reason_display"] = (row["risk_reasoning"] or "").replace("$", "\\$")
+    return rows
 
 
-def get_recent_trades(limit: int = 20):
+@st.cache_data(ttl=5, show_spinner=False)
+def get_recent_trades(limit: int = 20) -> list[dict]:
     """Fetch recent trades from database."""
     with get_session() as session:
-        stmt = select(Trade).order_by(Trade.opened_at.desc()).limit(limit)
-        return session.exec(stmt).all()
+        stmt = select(*_TRADE_COLUMNS).order_by(Trade.opened_at.desc()).limit(limit)
+        return [row._asdict() for row in session.exec(stmt).all()]
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def get_realized_pnl_sum(limit: int = 100) -> float:
+    """Sum PnL over the most recent trades in SQL (no rows materialized)."""
+    with get_session() as session:
+        recent = select(Trade.pnl_usd).order_by(Trade.opened_at.desc()).limit(limit).subquery()
+        return session.exec(select(func.sum(recent.c.pnl_usd))).one() or 0.0
 
 
-def get_open_trades():
+@st.cache_data(ttl=5, show_spinner=False)
+def get_open_trades() -> list[dict]:
     """Fetch open trades (trades with no closed_at)."""
     with get_session() as session:
-        stmt = select(Trade).where(Trade.closed_at == None).order_by(Trade.opened_at.desc())
-        return session.exec(stmt).all()
+        stmt = select(*_TRADE_COLUMNS).where(Trade.closed_at == None).order_by(Trade.opened_at.desc())
+        return [row._asdict() for row in session.exec(stmt).all()]
 
 
-def get_agent_logs(limit: int = 50):
+@st.cache_data(ttl=5, show_spinner=False)
+def get_agent_logs(limit: int = 50) -> list[dict]:
     """Fetch recent agent logs."""
     with get_session() as session:
-        stmt = select(AgentLog).order_by(AgentLog.timestamp.desc()).limit(limit)
-        return session.exec(stmt).all()
+        stmt = select(*_AGENT_LOG_COLUMNS).order_by(AgentLog.timestamp.desc()).limit(limit)
+        return [row._asdict() for row in session.exec(stmt).all()]
+
+
+def export_db_to_file(path: str) -> str:
+    """
+    Snapshot a DB into a temp file via the SQLite backup API (so commits
+    still sitting in the WAL are included). Returns the temp file path.
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    src = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    dst = sqlite3.connect(tmp_path)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+    return tmp_path
+
+
+def file_size_label(path: str) -> str:
+    """Human-readable file size from stat (no read)."""
+    return f"{os.path.getsize(path) / (1024 * 1024):.1f} MB"
+
+
+def db_export_button(label: str, path: str, file_name: str, key: str):
+    """
+    Two-step export: the DB is only snapshotted when "Prepare" is clicked,
+    and the download button exists for that rerun only.
+    """
+    if not os.path.exists(path):
+        return
+    if st.button(f"📦 Prepare {label} ({file_size_label(path)})", key=f"prep_{key}"):
+        tmp_path = export_db_to_file(path)
+        try:
+            with open(tmp_path, "rb") as f:
+                st.download_button(
+                    label=f"📥 {label}",
+                    data=f,
+                    file_name=file_name,
+                    mime="application/x-sqlite3",
+                    key=key
+                )
+        finally:
+            os.remove(tmp_path)
 
 
 def parse_json_safe(json_str: str | None) -> dict:
@@ -90,7 +201,7 @@ def parse_json_safe(json_str: str | None) -> dict:
     if not json_str:
         return {}
     try:
-        return json.loads(json_str)
+        return orjson.loads(json_str)
     except:
         return {"raw": json_str}
 
@@ -123,44 +234,25 @@ def main():
         col_d1, col_d2 = st.columns(2)
 
         # 1. Shadow DB
-        shadow_db_path = "/data/dspy_memory.db"
-        if os.path.exists(shadow_db_path):
-             with open(shadow_db_path, "rb") as f:
-                 st.download_button(
-                     label="📥 Shadow DB",
-                     data=f.read(),
-                     file_name="dspy_memory.db",
-                     mime="application/x-sqlite3",
-                     key="dl_shadow"
-                 )
+        db_export_button("Shadow DB", "/data/dspy_memory.db", "dspy_memory.db", "dl_shadow")
         
         # 2. Main Agent DB
-        agent_db_path = "/data/agent.db"
-        if os.path.exists(agent_db_path):
-             with open(agent_db_path, "rb") as f:
-                 st.download_button(
-                     label="📥 Main DB",
-                     data=f.read(),
-                     file_name="agent.db",
-                     mime="application/x-sqlite3",
-                     key="dl_main"
-                 )
+        db_export_button("Main DB", "/data/agent.db", "agent.db", "dl_main")
     
     # Main content
     col1, col2, col3, col4 = st.columns(4)
     
     # Get stats
     inferences = get_recent_inferences(1)
-    trades = get_recent_trades(100)
     open_trades = get_open_trades()
     
     last_inference = inferences[0] if inferences else None
-    total_pnl = sum(t.pnl_usd or 0 for t in trades if t.pnl_usd is not None)
+    total_pnl = get_realized_pnl_sum(100)
     
     with col1:
         st.metric(
             "Account Equity",
-            f"${last_inference.account_equity:,.2f}" if last_inference and last_inference.account_equity else "N/A",
+            f"${last_inference['account_equity']:,.2f}" if last_inference and last_inference["account_equity"] else "N/A",
             delta=None
         )
     
@@ -174,7 +266,7 @@ def main():
     with col3:
         st.metric(
             "Margin Usage",
-            f"{last_inference.account_margin_pct:.1f}%" if last_inference and last_inference.account_margin_pct else "0%",
+            f"{last_inference['account_margin_pct']:.1f}%" if last_inference and last_inference["account_margin_pct"] else "0%",
             delta_color="off"
         )
     
@@ -200,14 +292,14 @@ def main():
             st.info("No inferences yet. Run the agent to see results here.")
         else:
             for index, inf in enumerate(inferences):
-                analyst_signal = parse_json_safe(inf.analyst_signal)
-                risk_decision = parse_json_safe(inf.risk_decision)
-                final_action = inf.final_action or "N/A"
+                analyst_signal = inf["analyst_signal"]
+                risk_decision = inf["risk_decision"]
+                final_action = inf["final_action"] or "N/A"
                 
                 signal = analyst_signal.get("signal", "N/A")
                 signal_class = f"signal-{signal.lower()}" if signal in ["LONG", "SHORT", "HOLD"] else ""
                 
-                local_ts = to_local(inf.timestamp)
+                local_ts = to_local(inf["timestamp"])
                 ts_str = local_ts.strftime('%H:%M:%S')
                 
                 with st.expander(
@@ -215,14 +307,14 @@ def main():
                     expanded=(index == 0) # Expand first item
                 ):
                     # Account state at time of inference
-                    if inf.account_equity or inf.account_margin_pct:
-                        st.caption(f"💰 Equity: ${inf.account_equity:.2f} | Margin: {inf.account_margin_pct:.1f}%")
+                    if inf["account_equity"] or inf["account_margin_pct"]:
+                        st.caption(f"💰 Equity: ${inf['account_equity']:.2f} | Margin: {inf['account_margin_pct']:.1f}%")
                     
                     col_a, col_b = st.columns(2)
                     
                     with col_a:
                         st.markdown("### 🧠 Analyst")
-                        st.caption(f"Model: {inf.analyst_model}")
+                        st.caption(f"Model: {inf['analyst_model']}")
                         
                         # Signal badge with color
                         signal_color = {
@@ -242,16 +334,14 @@ def main():
                         if analyst_signal.get("take_profit"):
                             st.markdown(f"**TP:** ${analyst_signal.get('take_profit', 'N/A')}")
                         
-                        st.code(json.dumps(analyst_signal, indent=2), language="json")
+                        st.code(inf["analyst_signal_json"], language="json")
                          
                         st.markdown("**Reasoning:**")
-                        # Escape $ to prevent LaTeX rendering
-                        analyst_reason = (inf.analyst_reasoning or "")[:1500].replace("$", "\\$")
-                        st.markdown(f"*{analyst_reason}...*") 
+                        st.markdown(f"*{inf['analyst_reason_display']}...*") 
                         
                     with col_b:
                         st.markdown("### 🛡️ Risk Manager")
-                        st.caption(f"Model: {inf.risk_model}")
+                        st.caption(f"Model: {inf['risk_model']}")
                         
                         # Decision badge
                         risk_action = risk_decision.get("decision") or risk_decision.get("action", "N/A")
@@ -272,15 +362,13 @@ def main():
                             for cond in invalidation:
                                 st.markdown(f"- {cond}")
                         
-                        st.code(json.dumps(risk_decision, indent=2), language="json")
+                        st.code(inf["risk_decision_json"], language="json")
                          
                         st.markdown("**Reasoning:**")
-                        # Escape $ to prevent LaTeX rendering
-                        risk_reason = (inf.risk_reasoning or "")[:1500].replace("$", "\\$")
-                        st.markdown(f"*{risk_reason}...*")
+                        st.markdown(f"*{inf['risk_reason_display']}...*")
                     
                     st.divider()
-                    st.markdown(f"**Final Action:** `{final_action}` | **Models:** Analyst: `{inf.analyst_model}` | Risk: `{inf.risk_model}`")
+                    st.markdown(f"**Final Action:** `{final_action}` | **Models:** Analyst: `{inf['analyst_model']}` | Risk: `{inf['risk_model']}`")
     
     with tab2:
         st.subheader("Trade History")
@@ -290,24 +378,31 @@ def main():
         if not trades:
             st.info("No trades yet.")
         else:
-            # Convert to DataFrame
-            trade_data = []
-            for t in trades:
-                status = "CLOSED" if t.closed_at else "OPEN"
-                trade_data.append({
-                    "Date": t.opened_at.strftime("%Y-%m-%d %H:%M"),
-                    "Coin": t.coin,
-                    "Side": t.direction,
-                    "Entry": f"${t.entry_price:.2f}",
-                    "Size": f"${t.size_usd:.2f}",
-                    "Leverage": f"{t.leverage}x",
-                    "Status": status,
-                    "PnL": f"${t.pnl_usd:.2f}" if t.pnl_usd else "-",
-                    "PnL %": f"{t.pnl_pct:.1f}%" if t.pnl_pct else "-"
-                })
-            
-            df = pd.DataFrame(trade_data)
-            st.dataframe(df, use_container_width=True, hide_index=True)
+            # Convert to DataFrame column-wise; numbers stay numeric (formatted by column_config)
+            df = pd.DataFrame({
+                "Date": [t["opened_at"] for t in trades],
+                "Coin": [t["coin"] for t in trades],
+                "Side": [t["direction"] for t in trades],
+                "Entry": [t["entry_price"] for t in trades],
+                "Size": [t["size_usd"] for t in trades],
+                "Leverage": [t["leverage"] for t in trades],
+                "Status": ["CLOSED" if t["closed_at"] else "OPEN" for t in trades],
+                "PnL": pd.Series([t["pnl_usd"] for t in trades], dtype="float64"),
+                "PnL %": pd.Series([t["pnl_pct"] for t in trades], dtype="float64"),
+            })
+            st.dataframe(
+                df,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Date": st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm"),
+                    "Entry": st.column_config.NumberColumn(format="$%.2f"),
+                    "Size": st.column_config.NumberColumn(format="$%.2f"),
+                    "Leverage": st.column_config.NumberColumn(format="%dx"),
+                    "PnL": st.column_config.NumberColumn(format="$%.2f"),
+                    "PnL %": st.column_config.NumberColumn(format="%.1f%%"),
+                },
+            )
         
         # Open positions
         st.subheader("Open Positions")
@@ -317,7 +412,7 @@ def main():
             st.info("No open positions.")
         else:
             for t in open_trades:
-                st.warning(f"**{t.coin}** {t.direction} @ ${t.entry_price:.2f} | Size: ${t.size_usd:.2f} | {t.leverage}x")
+                st.warning(f"**{t['coin']}** {t['direction']} @ ${t['entry_price']:.2f} | Size: ${t['size_usd']:.2f} | {t['leverage']}x")
     
     with tab3:
         st.subheader("Agent Logs")
@@ -328,14 +423,14 @@ def main():
             st.info("No logs yet.")
         else:
             for log in logs:
-                icon = "🔵" if log.action_type == "LLM_RESPONSE" else "🟡" if log.action_type == "ERROR" else "⚪"
-                with st.expander(f"{icon} [{log.timestamp.strftime('%H:%M:%S')}] {log.action_type} - {log.node_name or 'system'}"):
-                    if log.output:
-                        st.code(log.output[:500])
-                    if log.error:
-                        st.error(log.error)
-                    if log.reasoning:
-                        st.text_area("Full Reasoning", log.reasoning[:3000], height=200, label_visibility="collapsed", key=f"log_reasoning_{log.id}")
+                icon = "🔵" if log["action_type"] == "LLM_RESPONSE" else "🟡" if log["action_type"] == "ERROR" else "⚪"
+                with st.expander(f"{icon} [{log['timestamp'].strftime('%H:%M:%S')}] {log['action_type']} - {log['node_name'] or 'system'}"):
+                    if log["output"]:
+                        st.code(log["output"])
+                    if log["error"]:
+                        st.error(log["error"])
+                    if log["reasoning"]:
+                        st.text_area("Full Reasoning", log["reasoning"], height=200, label_visibility="collapsed", key=f"log_reasoning_{log['id']}")
 
 
 if __name__ == "__main__":